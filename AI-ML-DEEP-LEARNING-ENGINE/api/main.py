@@ -4,12 +4,14 @@ High-performance AI API with multi-provider support
 """
 
 import os
-from typing import Optional, List, Dict, Any
+import json
+import time
+from typing import Optional, List, Dict, Any, Literal
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 from pydantic import BaseModel, Field
 import uvicorn
 from dotenv import load_dotenv
@@ -19,9 +21,16 @@ load_dotenv()
 
 from core_ai_engine.llm_engines import (
     get_orchestrator,
+    start_orchestrator,
+    shutdown_orchestrator,
     AIProvider,
-    ModelOrchestrator
+    ModelOrchestrator,
+    OrchestratorConfig
 )
+from core_ai_engine.llm_engines.model_orchestrator import OrchestratorDraining
+from core_ai_engine.llm_engines.deadline import DeadlineExceeded, deadline_scope
+from core_ai_engine.llm_engines.streaming import SSEEncoder, sse_frames
+from core_ai_engine.llm_engines.task_classifier import TASK_TYPES
 
 
 # Pydantic Models
@@ -55,8 +64,14 @@ class GenerateRequest(BaseModel):
 class SmartRouteRequest(BaseModel):
     """Smart routing request"""
     prompt: str = Field(..., description="User prompt")
-    task_type: str = Field("general", description="Task type: general, code, reasoning, fast, advanced")
+    task_type: Optional[str] = Field(None, description="Task type: general, code, reasoning, fast, advanced (inferred if omitted)")
     system_prompt: Optional[str] = Field(None, description="System prompt")
+    cascade: Optional[bool] = Field(None, description="Try the cheap model first and escalate on low confidence")
+
+
+class ClassifyRequest(BaseModel):
+    """Batch task classification request"""
+    prompts: List[str] = Field(..., min_length=1, max_length=1000, description="Prompts to classify")
 
 
 class MultiProviderRequest(BaseModel):
@@ -64,6 +79,12 @@ class MultiProviderRequest(BaseModel):
     prompt: str = Field(..., description="User prompt")
     providers: Optional[List[str]] = Field(None, description="List of providers to use")
     system_prompt: Optional[str] = Field(None, description="System prompt")
+    mode: Literal["all", "first", "quorum"] = Field("all", description="Fan-out mode")
+    quorum: Optional[int] = Field(None, ge=1, description="Successes needed in quorum mode")
+    provider_timeout: Optional[float] = Field(None, gt=0, description="Seconds allowed per provider")
+    provider_timeouts: Dict[str, float] = Field(default_factory=dict, description="Per-provider overrides of provider_timeout")
+    stragglers: Literal["cancel", "background"] = Field("cancel", description="Providers still running at return")
+    stream: bool = Field(False, description="Stream each answer as NDJSON as it completes")
 
 
 class ChatResponse(BaseModel):
@@ -79,6 +100,7 @@ class HealthResponse(BaseModel):
     status: str
     version: str
     providers: Dict[str, bool]
+    circuit_breakers: Dict[str, str] = Field(default_factory=dict)
     metrics: Dict[str, Any]
 
 
@@ -88,14 +110,17 @@ async def lifespan(app: FastAPI):
     """Manage application lifespan"""
     # Startup
     print("🚀 Starting AI/ML Deep Learning Engine...")
-    orchestrator = get_orchestrator()
+    # Built eagerly so requests never race to construct it; also warms
+    # connections and starts metrics flushing and shared-state sync.
+    # Configured from the environment, including the semantic cache embedder
+    orchestrator = await start_orchestrator(OrchestratorConfig())
     print(f"✅ Initialized with {len(orchestrator.providers)} providers")
     
     yield
     
-    # Shutdown
+    # Shutdown: finish in-flight requests, then release clients
     print("🛑 Shutting down AI Engine...")
-    await orchestrator.close()
+    await shutdown_orchestrator()
     print("✅ Shutdown complete")
 
 
@@ -119,6 +144,67 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Count requests and time them per route (streams are timed to their first byte)"""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        try:
+            registry = get_orchestrator().registry
+        except OrchestratorDraining:
+            registry = None  # Shut down; nothing left to record into
+        if registry:
+            registry.observe("http_request_duration_seconds", time.perf_counter() - start, method=request.method, path=path)
+            registry.inc("http_requests_total", method=request.method, path=path, status=status)
+
+
+@app.exception_handler(OrchestratorDraining)
+async def orchestrator_draining(request: Request, exc: OrchestratorDraining):
+    """Requests arriving during shutdown are told to retry elsewhere"""
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+
+# Default request budgets in seconds for routes that finish faster than
+# config.timeout; clients can tighten them with X-Request-Timeout
+ENDPOINT_TIMEOUTS: Dict[str, float] = {
+    "/v1/multi-provider": 120.0,
+    "/v1/classify": 10.0,
+    "/health": 5.0
+}
+
+
+@app.middleware("http")
+async def apply_request_deadline(request: Request, call_next):
+    """Run the request under its deadline so downstream work can give up in time"""
+    try:
+        orchestrator = get_orchestrator()
+    except OrchestratorDraining as e:
+        return JSONResponse(status_code=503, content={"detail": str(e)})
+    seconds = ENDPOINT_TIMEOUTS.get(request.url.path, orchestrator.config.timeout)
+    header = request.headers.get("x-request-timeout")
+    if header is not None:
+        try:
+            requested = float(header)
+        except ValueError:
+            requested = -1.0
+        if not requested > 0:
+            return JSONResponse(
+                status_code=400,
+                content={"detail": "X-Request-Timeout must be a positive number of seconds"}
+            )
+        seconds = min(seconds, requested)
+    
+    with deadline_scope(seconds):
+        return await call_next(request)
+
+
 # Routes
 @app.get("/", tags=["Health"])
 async def root():
@@ -134,19 +220,26 @@ async def root():
 async def health_check():
     """Health check endpoint"""
     orchestrator = get_orchestrator()
+    breaker_states = orchestrator.get_provider_health()
     
     return HealthResponse(
-        status="healthy",
+        status="healthy" if all(state == "closed" for state in breaker_states.values()) else "degraded",
         version="1.0.0",
         providers={
-            provider.value: True for provider in orchestrator.providers.keys()
+            provider.value: orchestrator.is_provider_available(provider)
+            for provider in orchestrator.providers.keys()
         },
+        circuit_breakers=breaker_states,
         metrics=orchestrator.get_metrics()
     )
 
 
 @app.post("/v1/chat/completions", tags=["AI"])
-async def chat_completions(request: ChatRequest):
+async def chat_completions(
+    request: ChatRequest,
+    http_request: Request,
+    x_tenant_id: Optional[str] = Header(None, description="Tenant for fair scheduling")
+):
     """
     OpenAI-compatible chat completions endpoint
     Supports multiple AI providers with intelligent routing
@@ -161,47 +254,63 @@ async def chat_completions(request: ChatRequest):
         if request.stream:
             provider_enum = AIProvider(request.provider) if request.provider else None
             
-            async def generate_stream():
-                async for chunk in orchestrator.stream_generate(
-                    prompt=messages[-1]["content"],
-                    provider=provider_enum,
-                    model=request.model,
-                    system_prompt=messages[0]["content"] if messages[0]["role"] == "system" else None,
-                    temperature=request.temperature,
-                    max_tokens=request.max_tokens
-                ):
-                    yield f"data: {chunk}\n\n"
-                yield "data: [DONE]\n\n"
+            chunks = orchestrator.stream_chat(
+                messages,
+                provider=provider_enum,
+                model=request.model,
+                temperature=request.temperature,
+                max_tokens=request.max_tokens,
+                priority="interactive",
+                tenant=x_tenant_id
+            )
+            frames = sse_frames(
+                chunks,
+                SSEEncoder(request.model),
+                is_disconnected=http_request.is_disconnected,
+                metrics=orchestrator.stream_metrics
+            )
             
-            return StreamingResponse(generate_stream(), media_type="text/event-stream")
+            return StreamingResponse(
+                frames,
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
         
         # Non-streaming response
         provider_enum = AIProvider(request.provider) if request.provider else None
-        user_message = messages[-1]["content"]
-        system_message = messages[0]["content"] if messages and messages[0]["role"] == "system" else None
         
-        response = await orchestrator.generate(
-            prompt=user_message,
+        completion = await orchestrator.complete_chat(
+            messages,
             provider=provider_enum,
             model=request.model,
-            system_prompt=system_message,
             temperature=request.temperature,
-            max_tokens=request.max_tokens
+            max_tokens=request.max_tokens,
+            priority="interactive",
+            tenant=x_tenant_id
         )
         
+        # Report the endpoint that served the call; cache entries written
+        # before endpoints were recorded fall back to the requested route
         return ChatResponse(
-            content=response,
-            provider=request.provider or orchestrator.config.default_provider.value,
-            model=request.model,
-            usage={"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+            content=completion.content,
+            provider=completion.provider or request.provider or orchestrator.config.default_provider.value,
+            model=completion.model if completion.provider else request.model,
+            usage=orchestrator.count_usage(messages, completion.content)
         )
         
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except OrchestratorDraining as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/v1/generate", tags=["AI"])
-async def generate_text(request: GenerateRequest):
+async def generate_text(
+    request: GenerateRequest,
+    x_tenant_id: Optional[str] = Header(None, description="Tenant for fair scheduling")
+):
     """
     Simple text generation endpoint
     """
@@ -218,7 +327,9 @@ async def generate_text(request: GenerateRequest):
                     model=request.model,
                     system_prompt=request.system_prompt,
                     temperature=request.temperature,
-                    max_tokens=request.max_tokens
+                    max_tokens=request.max_tokens,
+                    priority="interactive",
+                    tenant=x_tenant_id
                 ):
                     yield chunk
             
@@ -232,11 +343,17 @@ async def generate_text(request: GenerateRequest):
             model=request.model,
             system_prompt=request.system_prompt,
             temperature=request.temperature,
-            max_tokens=request.max_tokens
+            max_tokens=request.max_tokens,
+            priority="interactive",
+            tenant=x_tenant_id
         )
         
         return {"content": response}
         
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except OrchestratorDraining as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -250,20 +367,58 @@ async def smart_route(request: SmartRouteRequest):
     orchestrator = get_orchestrator()
     
     try:
+        prediction = None
+        if request.task_type not in TASK_TYPES and orchestrator.config.enable_task_classifier:
+            prediction = orchestrator.classify_task(request.prompt)
+        
         response = await orchestrator.smart_route(
             prompt=request.prompt,
             task_type=request.task_type,
-            system_prompt=request.system_prompt
+            system_prompt=request.system_prompt,
+            cascade=request.cascade,
+            prediction=prediction
         )
         
-        return {"content": response, "task_type": request.task_type}
+        result = {"content": response, "task_type": prediction.task_type if prediction else request.task_type}
+        if prediction:
+            result["predicted_output_tokens"] = prediction.output_tokens
+            result["confidence"] = round(prediction.confidence, 4)
+        return result
         
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except OrchestratorDraining as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/v1/classify", tags=["AI"])
+async def classify(request: ClassifyRequest):
+    """
+    Infer task types and expected output lengths for a batch of prompts
+    """
+    orchestrator = get_orchestrator()
+    predictions = orchestrator.classify_tasks(request.prompts)
+    
+    return {
+        "predictions": [
+            {
+                "task_type": p.task_type,
+                "confidence": round(p.confidence, 4),
+                "predicted_output_tokens": p.output_tokens,
+                "scores": {label: round(score, 4) for label, score in p.scores.items()}
+            }
+            for p in predictions
+        ]
+    }
+
+
 @app.post("/v1/multi-provider", tags=["AI"])
-async def multi_provider_generate(request: MultiProviderRequest):
+async def multi_provider_generate(
+    request: MultiProviderRequest,
+    x_tenant_id: Optional[str] = Header(None, description="Tenant for fair scheduling")
+):
     """
     Generate responses from multiple providers simultaneously
     Compare outputs from different AI models
@@ -275,14 +430,55 @@ async def multi_provider_generate(request: MultiProviderRequest):
         if request.providers:
             providers = [AIProvider(p) for p in request.providers]
         
+        provider_timeout: Any = request.provider_timeout
+        if request.provider_timeouts:
+            names = [p.value for p in providers] if providers else list(orchestrator.providers)
+            provider_timeout = {
+                name: request.provider_timeouts.get(name, request.provider_timeout)
+                for name in names
+            }
+        
+        if request.stream:
+            async def generate_ndjson():
+                fan_out = orchestrator.iter_multi_provider(
+                    prompt=request.prompt,
+                    providers=providers,
+                    system_prompt=request.system_prompt,
+                    priority="default",
+                    tenant=x_tenant_id,
+                    provider_timeout=provider_timeout,
+                    stragglers=request.stragglers
+                )
+                try:
+                    async for result in fan_out:
+                        yield json.dumps(result) + "\n"
+                finally:
+                    await fan_out.aclose()
+            
+            return StreamingResponse(
+                generate_ndjson(),
+                media_type="application/x-ndjson",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+        
         responses = await orchestrator.multi_provider_generate(
             prompt=request.prompt,
             providers=providers,
-            system_prompt=request.system_prompt
+            system_prompt=request.system_prompt,
+            priority="default",
+            tenant=x_tenant_id,
+            mode=request.mode,
+            quorum=request.quorum,
+            provider_timeout=provider_timeout,
+            stragglers=request.stragglers
         )
         
         return {"responses": responses}
         
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except OrchestratorDraining as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -291,29 +487,29 @@ async def multi_provider_generate(request: MultiProviderRequest):
 async def list_providers():
     """List all available AI providers and their models"""
     orchestrator = get_orchestrator()
-    
-    from core_ai_engine.llm_engines.models.nvidia_wrapper import NVIDIAWrapper
-    from core_ai_engine.llm_engines.models.sambanova_wrapper import SambaNovaWrapper
-    from core_ai_engine.llm_engines.models.cerebras_wrapper import CerebrasWrapper
+    clients = {provider.value: client for provider, client in orchestrator.providers.items()}
     
     return {
         "providers": {
-            "nvidia": {
-                "available": AIProvider.NVIDIA in orchestrator.providers,
-                "models": NVIDIAWrapper.AVAILABLE_MODELS
-            },
-            "sambanova": {
-                "available": AIProvider.SAMBANOVA in orchestrator.providers,
-                "models": SambaNovaWrapper.AVAILABLE_MODELS
-            },
-            "cerebras": {
-                "available": AIProvider.CEREBRAS in orchestrator.providers,
-                "models": CerebrasWrapper.AVAILABLE_MODELS
+            name: {
+                "available": name in clients,
+                "models": getattr(clients.get(name), "AVAILABLE_MODELS", {})
             }
+            for name in orchestrator.config.providers
         }
     }
 
 
+@app.get("/metrics", tags=["Monitoring"], response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus metrics merged across all workers"""
+    orchestrator = get_orchestrator()
+    return PlainTextResponse(
+        (await orchestrator.registry.amerged()).render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @app.get("/v1/metrics", tags=["Monitoring"])
 async def get_metrics():
     """Get performance metrics"""
@@ -325,7 +521,7 @@ async def get_metrics():
 async def clear_cache():
     """Clear response cache"""
     orchestrator = get_orchestrator()
-    orchestrator.clear_cache()
+    await orchestrator.clear_cache()
     return {"status": "cache cleared"}
 
 
@@ -0,0 +1,117 @@
+"""
+🧪 Mock Provider Server
+OpenAI-compatible endpoint backed by the mock provider, for offline load tests
+
+Run with:
+    MOCK_PROVIDER_ERROR_RATE=0.02 uvicorn api.mock_server:app --port 9000
+"""
+
+import json
+import time
+import uuid
+from typing import List, Optional
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+import uvicorn
+
+from core_ai_engine.llm_engines.mock_provider import MockProviderError, get_mock_client
+
+
+class Message(BaseModel):
+    """Chat message"""
+    role: str
+    content: str
+
+
+class CompletionRequest(BaseModel):
+    """Subset of the OpenAI chat completion request"""
+    model: str = Field("mock-small")
+    messages: List[Message]
+    max_tokens: Optional[int] = None
+    temperature: Optional[float] = None
+    stream: bool = False
+
+
+app = FastAPI(title="Mock AI Provider", version="1.0.0")
+client = get_mock_client()
+
+
+def _chunk(completion_id: str, model: str, delta: dict, finish_reason: Optional[str] = None) -> str:
+    payload = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+    }
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+@app.get("/v1/models")
+async def list_models():
+    """List mock models"""
+    return {
+        "object": "list",
+        "data": [{"id": name, "object": "model", "owned_by": "mock"} for name in client.AVAILABLE_MODELS]
+    }
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: CompletionRequest):
+    """OpenAI-compatible chat completion"""
+    messages = [m.model_dump() for m in request.messages]
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+
+    if request.stream:
+        async def stream():
+            yield _chunk(completion_id, request.model, {"role": "assistant"})
+            try:
+                async for token in client.stream_chat_completion(
+                    messages, model=request.model, max_tokens=request.max_tokens
+                ):
+                    yield _chunk(completion_id, request.model, {"content": token})
+            except MockProviderError as e:
+                yield f"data: {json.dumps({'error': {'message': str(e), 'code': e.status_code}})}\n\n"
+                return
+            yield _chunk(completion_id, request.model, {}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    try:
+        content = await client.chat_completion(
+            messages, model=request.model, max_tokens=request.max_tokens
+        )
+    except MockProviderError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    completion_tokens = len(content.split())
+    prompt_tokens = sum(len(m["content"].split()) for m in messages)
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    }
+
+
+@app.get("/health")
+async def health():
+    """Health check"""
+    return {"status": "healthy", "profile": client.profile.__dict__, "stats": client.stats}
+
+
+if __name__ == "__main__":
+    uvicorn.run("api.mock_server:app", host="0.0.0.0", port=9000)
@@ -5,23 +5,37 @@ Advanced AI capabilities with multi-provider support
 
 from .llm_engines import (
     ModelOrchestrator,
+    Completion,
     AIProvider,
     get_orchestrator,
+    start_orchestrator,
+    shutdown_orchestrator,
     ai_generate,
     ai_stream,
-    get_nvidia_client,
-    get_sambanova_client,
-    get_cerebras_client,
+    register_provider,
 )
 
+_LAZY_EXPORTS = ("get_nvidia_client", "get_sambanova_client", "get_cerebras_client")
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        from . import llm_engines
+        return getattr(llm_engines, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 __version__ = "1.0.0"
 
 __all__ = [
     "ModelOrchestrator",
+    "Completion",
     "AIProvider",
     "get_orchestrator",
+    "start_orchestrator",
+    "shutdown_orchestrator",
     "ai_generate",
     "ai_stream",
+    "register_provider",
     "get_nvidia_client",
     "get_sambanova_client",
     "get_cerebras_client",
@@ -8,6 +8,8 @@ from typing import Dict, Any, List
 from datetime import datetime
 import logging
 
+from ..llm_engines.deadline import within_deadline
+
 logger = logging.getLogger(__name__)
 
 
@@ -65,12 +67,13 @@ class ExecutorAgent:
             logger.info(f"⚡ Executing task: {task.id} (Type: {task.type})")
             
             # Simulate execution based on task type
+            # Execution is cancelled once the request deadline passes
             if task.type in self.capabilities:
                 # Specialized execution
-                result = await self._specialized_execution(task)
+                result = await within_deadline(self._specialized_execution(task), f"task {task.id}")
             else:
                 # General execution
-                result = await self._general_execution(task)
+                result = await within_deadline(self._general_execution(task), f"task {task.id}")
             
             # Update metrics
             end_time = datetime.now()
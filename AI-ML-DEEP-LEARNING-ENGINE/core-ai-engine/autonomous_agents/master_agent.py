@@ -9,6 +9,8 @@ from dataclasses import dataclass, field
 from datetime import datetime
 import logging
 
+from ..llm_engines.deadline import check_deadline
+
 logger = logging.getLogger(__name__)
 
 
@@ -175,6 +177,9 @@ class MasterAgent:
             # Execute subtasks
             results = []
             for subtask in subtasks:
+                # Stop before starting work the request no longer has time for
+                check_deadline(what=f"subtask {subtask.id}")
+                
                 # Assign to agent
                 agent_id = self.assign_task(subtask)
                 
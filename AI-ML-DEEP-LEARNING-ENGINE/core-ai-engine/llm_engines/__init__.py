@@ -5,23 +5,61 @@ Multi-provider AI model integration with intelligent orchestration
 
 from .model_orchestrator import (
     ModelOrchestrator,
+    OrchestratorConfig,
+    Completion,
     AIProvider,
     get_orchestrator,
+    start_orchestrator,
+    shutdown_orchestrator,
     ai_generate,
     ai_stream
 )
+from .response_cache import ResponseCache
+from .provider_registry import register_provider, available_providers
+from .mock_provider import MockProvider, get_mock_client
+
+# Provider wrappers are imported on first access so that a missing or
+# broken provider SDK does not prevent the package from loading
+_LAZY_EXPORTS = {
+    "NVIDIAWrapper": ".models.nvidia_wrapper",
+    "get_nvidia_client": ".models.nvidia_wrapper",
+    "nvidia_chat": ".models.nvidia_wrapper",
+    "SambaNovaWrapper": ".models.sambanova_wrapper",
+    "get_sambanova_client": ".models.sambanova_wrapper",
+    "sambanova_chat": ".models.sambanova_wrapper",
+    "CerebrasWrapper": ".models.cerebras_wrapper",
+    "get_cerebras_client": ".models.cerebras_wrapper",
+    "cerebras_chat": ".models.cerebras_wrapper",
+    "cerebras_code": ".models.cerebras_wrapper",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    return getattr(import_module(module, __name__), name)
 
-from .models.nvidia_wrapper import NVIDIAWrapper, get_nvidia_client, nvidia_chat
-from .models.sambanova_wrapper import SambaNovaWrapper, get_sambanova_client, sambanova_chat
-from .models.cerebras_wrapper import CerebrasWrapper, get_cerebras_client, cerebras_chat, cerebras_code
 
 __all__ = [
     # Orchestrator
     "ModelOrchestrator",
+    "OrchestratorConfig",
+    "Completion",
     "AIProvider",
     "get_orchestrator",
+    "start_orchestrator",
+    "shutdown_orchestrator",
     "ai_generate",
     "ai_stream",
+    "ResponseCache",
+    
+    # Provider registry
+    "register_provider",
+    "available_providers",
+    "MockProvider",
+    "get_mock_client",
     
     # NVIDIA
     "NVIDIAWrapper",
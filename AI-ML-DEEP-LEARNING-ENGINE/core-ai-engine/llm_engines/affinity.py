@@ -0,0 +1,121 @@
+"""
+🧲 Prefix Affinity
+Sticky routing of shared prompt prefixes to the endpoint that cached them
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+Endpoint = Tuple[str, Optional[str]]
+
+
+def prefix_keys(messages: List[Dict[str, str]], min_chars: int = 2048) -> List[str]:
+    """
+    Digest every stable prefix of a conversation
+
+    A prefix ends at a message boundary before the final message (the
+    final message is the part that changes between requests). Digests
+    are chained, so hashing all prefixes is linear in the conversation
+    length. Prefixes shorter than ``min_chars`` are too small for
+    provider-side prefix caches to matter and are skipped.
+
+    Args:
+        messages: Chat messages, oldest first
+        min_chars: Minimum prefix length worth routing on
+
+    Returns:
+        Prefix digests, longest first
+    """
+    keys: List[str] = []
+    digest = hashlib.blake2b(digest_size=16)
+    length = 0
+
+    for message in messages[:-1]:
+        content = message.get("content") or ""
+        digest.update((message.get("role") or "").encode())
+        digest.update(b"\x00")
+        digest.update(content.encode())
+        digest.update(b"\x00")
+        length += len(content)
+        if length >= min_chars:
+            keys.append(digest.copy().hexdigest())
+
+    keys.reverse()
+    return keys
+
+
+class AffinityTable:
+    """
+    Prefix Affinity Table
+
+    Remembers which (provider, model) endpoint last served each prompt
+    prefix, so later requests sharing that prefix can prefer the
+    endpoint whose prefix/KV cache is already warm. Entries expire after
+    ``ttl`` seconds, roughly how long providers keep cached prefixes.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[Endpoint, float]]" = OrderedDict()
+
+        self.stats = {
+            "lookups": 0,
+            "hits": 0,
+            "misses": 0,
+            "overrides": 0
+        }
+
+    def lookup(self, keys: List[str]) -> Optional[Endpoint]:
+        """
+        Find the endpoint that served the longest known prefix
+
+        Args:
+            keys: Prefix digests, longest first
+
+        Returns:
+            (provider, model), or None without a live entry
+        """
+        if not keys:
+            return None
+
+        self.stats["lookups"] += 1
+        now = time.monotonic()
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            endpoint, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                continue
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return endpoint
+
+        self.stats["misses"] += 1
+        return None
+
+    def record(self, keys: List[str], endpoint: Endpoint) -> None:
+        """Remember that endpoint now holds these prefixes"""
+        expires_at = time.monotonic() + self.ttl
+        for key in keys:
+            self._entries[key] = (endpoint, expires_at)
+            self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get affinity hit rates"""
+        lookups = self.stats["lookups"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            "sticky_rate": round(
+                (self.stats["hits"] - self.stats["overrides"]) / lookups, 4
+            ) if lookups else 0.0
+        }
@@ -0,0 +1,118 @@
+"""
+📦 Micro Batcher
+Collect small requests for the same endpoint and dispatch them together
+"""
+
+import asyncio
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Tuple
+
+from .provider_stats import LatencyWindow
+
+DispatchFn = Callable[[Hashable, List[Any]], Awaitable[List[Any]]]
+
+
+class MicroBatcher:
+    """
+    Micro Batcher
+
+    Requests submitted under the same key are held for at most
+    ``max_wait`` seconds or until ``max_batch_size`` have arrived, then
+    handed to ``dispatch_fn`` as one batch. ``dispatch_fn`` returns one
+    result per item, in order; an exception instance in that list fails
+    only the matching request.
+    """
+
+    def __init__(
+        self,
+        dispatch_fn: DispatchFn,
+        max_batch_size: int = 8,
+        max_wait: float = 0.005
+    ):
+        self.dispatch_fn = dispatch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        self._pending: Dict[Hashable, List[Tuple[Any, asyncio.Future, float]]] = {}
+        self._timers: Dict[Hashable, asyncio.TimerHandle] = {}
+        self._tasks: set = set()
+
+        self.batch_sizes: Counter = Counter()
+        self.queue_delay = LatencyWindow()
+        self.stats = {
+            "requests": 0,
+            "batches": 0
+        }
+
+    async def submit(self, key: Hashable, item: Any) -> Any:
+        """
+        Queue an item for batched dispatch
+
+        Args:
+            key: Batch key (e.g. provider and model)
+            item: Request payload
+
+        Returns:
+            Result for this item
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        queue = self._pending.setdefault(key, [])
+        queue.append((item, future, time.monotonic()))
+        self.stats["requests"] += 1
+
+        if len(queue) >= self.max_batch_size:
+            self._flush(key)
+        elif len(queue) == 1:
+            self._timers[key] = loop.call_later(self.max_wait, self._flush, key)
+
+        return await future
+
+    def _flush(self, key: Hashable) -> None:
+        """Dispatch everything queued under key"""
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+
+        batch = [entry for entry in self._pending.pop(key, []) if not entry[1].cancelled()]
+        if not batch:
+            return
+
+        task = asyncio.ensure_future(self._run(key, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, key: Hashable, batch: List[Tuple[Any, asyncio.Future, float]]) -> None:
+        """Run one batch and resolve its futures"""
+        now = time.monotonic()
+        self.stats["batches"] += 1
+        self.batch_sizes[len(batch)] += 1
+        for _, _, enqueued_at in batch:
+            self.queue_delay.observe(now - enqueued_at)
+
+        try:
+            results = await self.dispatch_fn(key, [item for item, _, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+
+        for (_, future, _), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batch-size and queue-delay distributions"""
+        batches = self.stats["batches"]
+        return {
+            **self.stats,
+            "avg_batch_size": round(self.stats["requests"] / batches, 2) if batches else 0.0,
+            "batch_size_histogram": dict(sorted(self.batch_sizes.items())),
+            "queue_delay_p50": self.queue_delay.percentile(50),
+            "queue_delay_p99": self.queue_delay.percentile(99),
+            "pending": sum(len(queue) for queue in self._pending.values())
+        }
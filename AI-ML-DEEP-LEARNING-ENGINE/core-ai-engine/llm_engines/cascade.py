@@ -0,0 +1,152 @@
+"""
+🪜 Cascade Verifiers
+Score a cheap model's answer to decide whether to escalate to a larger model
+"""
+
+import re
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Phrases that signal the model did not actually answer
+_UNCERTAIN = re.compile(
+    r"\b(i(?:'m| am) not (?:sure|certain)|i (?:cannot|can't|don't know)|"
+    r"as an ai\b|i do not have (?:enough )?information|unable to (?:answer|help))",
+    re.IGNORECASE
+)
+_CODE_REQUEST = re.compile(r"\b(code|function|script|implement|snippet|class|regex|sql)\b", re.IGNORECASE)
+_WORD = re.compile(r"\w+")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+JUDGE_PROMPT = (
+    "Rate how well the answer addresses the question, from 0 (wrong or evasive) "
+    "to 10 (complete and correct). Reply with the number only.\n\n"
+    "Question:\n{prompt}\n\nAnswer:\n{answer}"
+)
+
+
+class AnswerVerifier(ABC):
+    """
+    Base verifier
+
+    ``score`` returns a confidence in [0, 1]; the orchestrator keeps the
+    cheap answer when the score reaches its cascade threshold.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def score(self, prompt: str, answer: str) -> float:
+        """Confidence that the answer is good enough to return"""
+
+
+class HeuristicVerifier(AnswerVerifier):
+    """
+    Heuristic Verifier
+
+    Free, local checks for the common ways a small model falls short:
+    empty or very short answers, refusals and hedging, degenerate
+    repetition, answers cut off mid-sentence, and code requests answered
+    without code. Each failed check multiplies the score down.
+    """
+
+    name = "heuristic"
+
+    def __init__(self, min_words: int = 3, max_repetition: float = 0.5):
+        self.min_words = min_words
+        self.max_repetition = max_repetition
+
+    async def score(self, prompt: str, answer: str) -> float:
+        return self.score_text(prompt, answer)
+
+    def score_text(self, prompt: str, answer: str) -> float:
+        """Synchronous heuristic score"""
+        text = answer.strip()
+        words = _WORD.findall(text.lower())
+        if not words:
+            return 0.0
+
+        score = 1.0
+        if len(words) < self.min_words:
+            score *= 0.5
+        if _UNCERTAIN.search(text):
+            score *= 0.3
+
+        # Share of repeated word trigrams; loops push this towards 1
+        if len(words) >= 12:
+            trigrams = list(zip(words, words[1:], words[2:]))
+            repetition = 1.0 - len(set(trigrams)) / len(trigrams)
+            if repetition > self.max_repetition:
+                score *= 0.3
+
+        # Long answers that stop without closing punctuation were likely truncated
+        if len(words) >= 40 and text[-1] not in ".!?`)]}\"'*|" and not text.endswith("```"):
+            score *= 0.7
+
+        if _CODE_REQUEST.search(prompt) and "```" not in text and "    " not in text:
+            score *= 0.6
+
+        return score
+
+
+class JudgeVerifier(AnswerVerifier):
+    """
+    Judge Verifier
+
+    Asks a (small) judge model to grade the answer from 0 to 10. Cheap
+    answers that fail the heuristic checks are rejected without spending
+    a judge call. An unparseable verdict counts as 0, so the request
+    escalates rather than shipping an unverified answer.
+    """
+
+    name = "judge"
+
+    def __init__(
+        self,
+        judge: Callable[[str], Awaitable[str]],
+        prescreen: Optional[HeuristicVerifier] = None,
+        prescreen_floor: float = 0.3
+    ):
+        self.judge = judge
+        self.prescreen = prescreen or HeuristicVerifier()
+        self.prescreen_floor = prescreen_floor
+
+    async def score(self, prompt: str, answer: str) -> float:
+        if self.prescreen.score_text(prompt, answer) < self.prescreen_floor:
+            return 0.0
+
+        try:
+            verdict = await self.judge(JUDGE_PROMPT.format(prompt=prompt, answer=answer))
+        except Exception as e:
+            logger.warning(f"Cascade judge failed: {e}")
+            return 0.0
+
+        match = _NUMBER.search(verdict)
+        if not match:
+            return 0.0
+        return min(1.0, float(match.group()) / 10.0)
+
+
+def build_verifier(
+    kind: str,
+    judge: Optional[Callable[[str], Awaitable[str]]] = None
+) -> AnswerVerifier:
+    """
+    Create a verifier by name
+
+    Args:
+        kind: "heuristic" (default) or "judge"
+        judge: Judge call, required for "judge"
+
+    Returns:
+        Verifier instance
+    """
+    if kind == "heuristic":
+        return HeuristicVerifier()
+    if kind == "judge":
+        if judge is None:
+            raise ValueError("The judge verifier needs a judge call")
+        return JudgeVerifier(judge)
+    raise ValueError(f"Unknown cascade verifier: {kind}")
@@ -0,0 +1,175 @@
+"""
+🔌 Circuit Breaker
+Skip failing providers and re-admit them gradually
+"""
+
+import time
+from enum import Enum
+from typing import Any, Callable, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    """Circuit breaker states"""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreakerOpen(Exception):
+    """Raised when a request is short-circuited by an open breaker"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit breaker for {name} is open (retry in {retry_after:.1f}s)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Circuit Breaker
+
+    - CLOSED: requests flow; ``failure_threshold`` consecutive failures open it
+    - OPEN: requests are rejected instantly for ``recovery_timeout`` seconds
+    - HALF_OPEN: up to ``half_open_max_probes`` concurrent probe requests are
+      let through; ``success_threshold`` successes close the breaker, any
+      failure re-opens it
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_probes: int = 1,
+        success_threshold: int = 2,
+        on_open: Optional[Callable[["CircuitBreaker"], None]] = None
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_probes = half_open_max_probes
+        self.success_threshold = success_threshold
+        self.on_open = on_open
+
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._successes = 0
+        self._probes_in_flight = 0
+        self._opened_at = 0.0
+
+        self.stats = {
+            "rejected": 0,
+            "times_opened": 0,
+            "remote_trips": 0
+        }
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state, moving OPEN to HALF_OPEN once the timeout has passed"""
+        if (
+            self._state == CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.recovery_timeout
+        ):
+            self._transition(CircuitState.HALF_OPEN)
+        return self._state
+
+    def is_available(self) -> bool:
+        """Whether a request would currently be admitted"""
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.HALF_OPEN:
+            return self._probes_in_flight < self.half_open_max_probes
+        return False
+
+    def acquire(self) -> None:
+        """
+        Admit a request or raise
+
+        Raises:
+            CircuitBreakerOpen: If the breaker rejects the request
+        """
+        if not self.is_available():
+            self.stats["rejected"] += 1
+            raise CircuitBreakerOpen(self.name, self.retry_after())
+
+        if self._state == CircuitState.HALF_OPEN:
+            self._probes_in_flight += 1
+
+    def record_success(self) -> None:
+        """Record a successful request"""
+        if self._state == CircuitState.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            self._successes += 1
+            if self._successes >= self.success_threshold:
+                self._transition(CircuitState.CLOSED)
+        else:
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        """Record a failed request"""
+        if self._state == CircuitState.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            self._transition(CircuitState.OPEN)
+        elif self._state == CircuitState.CLOSED:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._transition(CircuitState.OPEN)
+
+    def release(self) -> None:
+        """Release an admitted request that ended without an outcome (e.g. cancelled)"""
+        if self._state == CircuitState.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def trip(self, retry_after: float) -> None:
+        """
+        Open the breaker because another worker saw the provider fail
+
+        Only a closed breaker is tripped; one that is already open or
+        probing has its own view of the provider. The local ``on_open``
+        hook is not called, so trips are not echoed back.
+
+        Args:
+            retry_after: Seconds until probing starts
+        """
+        if self._state != CircuitState.CLOSED or retry_after <= 0:
+            return
+        self._transition(CircuitState.OPEN, notify=False)
+        self._opened_at = time.monotonic() - max(0.0, self.recovery_timeout - retry_after)
+        self.stats["remote_trips"] += 1
+
+    def retry_after(self) -> float:
+        """Seconds until an open breaker starts probing"""
+        if self._state != CircuitState.OPEN:
+            return 0.0
+        return max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+
+    def _transition(self, state: CircuitState, notify: bool = True) -> None:
+        """Move to a new state and reset counters"""
+        self._state = state
+        self._failures = 0
+        self._successes = 0
+        self._probes_in_flight = 0
+
+        if state == CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+            self.stats["times_opened"] += 1
+            logger.warning(f"🔴 Circuit breaker OPEN for {self.name}")
+            if notify and self.on_open:
+                self.on_open(self)
+        elif state == CircuitState.HALF_OPEN:
+            logger.info(f"🟡 Circuit breaker HALF_OPEN for {self.name} - probing")
+        else:
+            logger.info(f"🟢 Circuit breaker CLOSED for {self.name}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get breaker state and counters"""
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self._failures,
+            "retry_after": round(self.retry_after(), 2),
+            **self.stats
+        }
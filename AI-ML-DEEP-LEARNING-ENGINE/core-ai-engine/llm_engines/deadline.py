@@ -0,0 +1,135 @@
+"""
+⏳ Request Deadlines
+Carry a request's time budget through generation, retries, agents and tools
+"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Monotonic time by which the current request must finish. Context
+# variables are copied into tasks, so fan-outs, hedges and stream
+# read-ahead tasks inherit the deadline of the request that started them.
+_deadline: ContextVar[Optional[float]] = ContextVar("ai_engine_deadline", default=None)
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """Raised when the remaining request budget cannot cover the next step"""
+
+    status_code = 504
+
+
+def get_deadline() -> Optional[float]:
+    """Monotonic deadline of the current request, or None without one"""
+    return _deadline.get()
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None without one"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[Optional[float]]:
+    """
+    Run a block under a deadline
+
+    A scope can only tighten an enclosing deadline, never extend it, so a
+    component's own time limit never outlives the client's.
+
+    Args:
+        seconds: Budget for the block (None keeps the enclosing deadline)
+
+    Yields:
+        The effective monotonic deadline
+    """
+    current = _deadline.get()
+    if seconds is not None:
+        proposed = time.monotonic() + seconds
+        if current is None or proposed < current:
+            current = proposed
+    token = _deadline.set(current)
+    try:
+        yield current
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def no_deadline() -> Iterator[None]:
+    """
+    Run a block without the enclosing request's deadline
+
+    For work shared between requests: tasks created inside the block do
+    not inherit one caller's budget, and each caller bounds its own wait
+    with ``within_deadline`` instead.
+    """
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def check_deadline(needed: float = 0.0, what: str = "request") -> None:
+    """
+    Fail fast when the remaining budget cannot cover the next step
+
+    Args:
+        needed: Seconds the next step is expected to take
+        what: Step name for the error message
+
+    Raises:
+        DeadlineExceeded: If fewer than ``needed`` seconds remain
+    """
+    left = remaining()
+    if left is not None and left <= needed:
+        raise DeadlineExceeded(
+            f"Deadline exceeded before {what} ({max(0.0, left):.3f}s left, {needed:.3f}s needed)"
+        )
+
+
+def bounded_timeout(timeout: Optional[float]) -> Optional[float]:
+    """A component timeout capped by the remaining request budget"""
+    left = remaining()
+    if left is None:
+        return timeout
+    return left if timeout is None else min(timeout, left)
+
+
+async def within_deadline(awaitable: Awaitable[T], what: str = "request") -> T:
+    """
+    Await something, cancelling it when the current deadline passes
+
+    Args:
+        awaitable: Work to run
+        what: Step name for the error message
+
+    Returns:
+        The awaitable's result
+
+    Raises:
+        DeadlineExceeded: If the deadline passes first
+    """
+    left = remaining()
+    if left is None:
+        return await awaitable
+    if left <= 0:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise DeadlineExceeded(f"Deadline exceeded before {what}")
+
+    try:
+        return await asyncio.wait_for(awaitable, timeout=left)
+    except DeadlineExceeded:
+        raise
+    except asyncio.TimeoutError as e:
+        # Only our own timeout becomes a deadline error; inner timeouts pass through
+        if remaining() > 0:
+            raise
+        raise DeadlineExceeded(f"Deadline exceeded during {what}") from e
@@ -0,0 +1,266 @@
+"""
+💾 Disk Cache
+Persistent response cache tier shared between worker processes
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache:
+    """
+    SQLite-backed response cache
+
+    Runs in WAL mode so several uvicorn workers on one host can read and
+    write the same file concurrently, with the database pages memory-mapped
+    for fast lookups. Entries survive restarts; the file is kept under
+    ``max_bytes`` by periodic compaction that drops expired entries and then
+    the least recently accessed ones, and returns the freed pages to the
+    filesystem (incremental auto-vacuum). Entry and byte counts are taken
+    at compaction so ``get_stats`` never queries the database.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 512 * 1024 * 1024,
+        default_ttl: Optional[float] = 86400.0,
+        compact_every: int = 100,
+        mmap_size: int = 256 * 1024 * 1024
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.compact_every = compact_every
+        self.mmap_size = mmap_size
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes_since_compact = 0
+        self._entries = 0
+        self._bytes = 0
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "evictions": 0,
+            "compactions": 0,
+            "errors": 0
+        }
+
+        logger.info(f"💾 Disk cache at {path} (max_bytes={max_bytes})")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use"""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            # Must precede table creation; older files are converted once below
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, "
+                "value TEXT NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "accessed_at REAL NOT NULL, "
+                "expires_at REAL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)"
+            )
+            conn.commit()
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                conn.execute("VACUUM")
+            self._entries, self._bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached response or None on miss
+        """
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT value FROM responses "
+                    "WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                    (key, now)
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                        (now, key)
+                    )
+                    conn.commit()
+        except sqlite3.Error as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Disk cache read failed: {e}")
+            return None
+
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        return row[0]
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        """
+        Store a response
+
+        Args:
+            key: Cache key
+            value: Response to cache
+            ttl: Time to live in seconds (uses default_ttl if None)
+
+        Returns:
+            True if stored
+        """
+        size = len(key) + len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return False
+
+        now = time.time()
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = now + ttl if ttl else None
+
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, size, accessed_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, value, size, now, expires_at)
+                )
+                conn.commit()
+                self._writes_since_compact += 1
+                should_compact = self._writes_since_compact >= self.compact_every
+        except sqlite3.Error as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Disk cache write failed: {e}")
+            return False
+
+        self.stats["sets"] += 1
+        if should_compact:
+            self.compact()
+        return True
+
+    def compact(self) -> int:
+        """
+        Drop expired entries and trim the cache to its size cap
+
+        Returns:
+            Number of entries removed
+        """
+        now = time.time()
+        removed = 0
+
+        try:
+            with self._lock:
+                conn = self._connect()
+                self._writes_since_compact = 0
+
+                cursor = conn.execute(
+                    "DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                    (now,)
+                )
+                removed += cursor.rowcount
+
+                total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+                if total > self.max_bytes:
+                    # Trim to 90% of the cap so compaction isn't triggered on every write
+                    excess = total - int(self.max_bytes * 0.9)
+                    freed = 0
+                    victims = []
+                    for key, size in conn.execute(
+                        "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+                    ):
+                        if freed >= excess:
+                            break
+                        victims.append((key,))
+                        freed += size
+
+                    conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+                    removed += len(victims)
+                    self.stats["evictions"] += len(victims)
+
+                conn.commit()
+                if removed:
+                    conn.executescript("PRAGMA incremental_vacuum;")  # execute() frees one page per step
+                self._entries, self._bytes = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+                ).fetchone()
+        except sqlite3.Error as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Disk cache compaction failed: {e}")
+            return removed
+
+        self.stats["compactions"] += 1
+        logger.debug(f"Disk cache compacted ({removed} entries removed)")
+        return removed
+
+    async def aget(self, key: str) -> Optional[str]:
+        """Look up a cached response without blocking the event loop"""
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        """Store a response without blocking the event loop"""
+        return await asyncio.to_thread(self.set, key, value, ttl)
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute("DELETE FROM responses")
+                conn.commit()
+                conn.executescript("PRAGMA incremental_vacuum;")  # execute() frees one page per step
+                self._entries, self._bytes = 0, 0
+        except sqlite3.Error as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Disk cache clear failed: {e}")
+
+    async def aclear(self) -> None:
+        """Drop all entries without blocking the event loop"""
+        await asyncio.to_thread(self.clear)
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics (entry and byte counts as of the last compaction)"""
+        return {
+            **self.stats,
+            "entries": self._entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "path": self.path
+        }
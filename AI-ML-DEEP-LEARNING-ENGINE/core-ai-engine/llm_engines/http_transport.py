@@ -0,0 +1,150 @@
+"""
+🌐 HTTP Transport
+Shared pooled async HTTP client for all provider wrappers
+"""
+
+import asyncio
+import importlib.util
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Optional
+import logging
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class _CountingTransport(httpx.AsyncBaseTransport):
+    """Delegating transport that tracks requests and in-flight calls per host"""
+
+    def __init__(self, inner: httpx.AsyncHTTPTransport):
+        self.inner = inner
+        self.requests: Dict[str, int] = defaultdict(int)
+        self.in_flight: Dict[str, int] = defaultdict(int)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        self.requests[host] += 1
+        self.in_flight[host] += 1
+        try:
+            return await self.inner.handle_async_request(request)
+        except Exception:
+            self.errors[host] += 1
+            raise
+        finally:
+            self.in_flight[host] -= 1
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class HTTPTransport:
+    """
+    Shared HTTP Transport
+
+    One ``httpx.AsyncClient`` whose connection pool (kept per origin by
+    httpx) is reused by every provider wrapper, so TLS handshakes and DNS
+    lookups are paid once per connection rather than once per request.
+    HTTP/2 multiplexing is used when the ``h2`` package is installed.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = True,
+        connect_timeout: float = 10.0,
+        read_timeout: float = 300.0
+    ):
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested but 'h2' is not installed; using HTTP/1.1")
+            http2 = False
+
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+
+        self._transport: Optional[_CountingTransport] = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The shared client, created on first use"""
+        if self._client is None or self._client.is_closed:
+            self._transport = _CountingTransport(
+                httpx.AsyncHTTPTransport(limits=self.limits, http2=self.http2)
+            )
+            self._client = httpx.AsyncClient(transport=self._transport, timeout=self.timeout)
+            logger.info(
+                f"🌐 Shared HTTP transport ready (http2={self.http2}, "
+                f"max_connections={self.limits.max_connections})"
+            )
+        return self._client
+
+    async def warm_up(self, urls: Iterable[str], timeout: float = 5.0) -> Dict[str, bool]:
+        """
+        Open connections to provider hosts ahead of traffic
+
+        Any HTTP response counts as success: the point is to complete DNS,
+        TCP and TLS setup and leave a keep-alive connection in the pool.
+
+        Args:
+            urls: Base URLs to connect to
+            timeout: Per-host timeout in seconds
+
+        Returns:
+            Mapping of URL to whether a connection was established
+        """
+        async def touch(url: str) -> bool:
+            try:
+                await self.client.head(url, timeout=timeout)
+                return True
+            except httpx.HTTPError as e:
+                logger.warning(f"Warm-up of {url} failed: {e}")
+                return False
+
+        urls = list(dict.fromkeys(u for u in urls if u))
+        results = await asyncio.gather(*(touch(url) for url in urls))
+        return dict(zip(urls, results))
+
+    async def aclose(self) -> None:
+        """Close pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._transport = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool utilization per host"""
+        stats: Dict[str, Any] = {
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "hosts": {}
+        }
+        if self._transport is None:
+            return stats
+
+        pool = getattr(self._transport.inner, "_pool", None)
+        connections = list(getattr(pool, "connections", []) or [])
+        stats["open_connections"] = len(connections)
+        stats["idle_connections"] = sum(
+            1 for conn in connections if getattr(conn, "is_idle", lambda: False)()
+        )
+        stats["pool_utilization"] = round(len(connections) / self.limits.max_connections, 4)
+
+        stats["hosts"] = {
+            host: {
+                "requests": self._transport.requests[host],
+                "in_flight": self._transport.in_flight[host],
+                "errors": self._transport.errors[host]
+            }
+            for host in self._transport.requests
+        }
+        return stats
@@ -0,0 +1,126 @@
+"""
+⚖️ Load Balancer
+Latency- and error-aware provider selection
+"""
+
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+from .provider_stats import ProviderStats
+
+Endpoint = Tuple[str, Optional[str]]
+
+
+class LoadBalancer:
+    """
+    Adaptive Load Balancer
+
+    Scores each provider/model endpoint by its smoothed latency, scaled up
+    by outstanding requests and recent errors, and picks the cheapest.
+
+    Policies:
+    - ``ewma``: least expected latency over all candidates
+    - ``p2c``: power of two choices, comparing the preferred endpoint (or a
+      random one) against one other random candidate
+
+    The preferred endpoint's cost is divided by ``preference`` so static
+    routing stays in effect until an alternative is clearly better.
+    Endpoints that have never been tried cost nothing, so each one is
+    probed once before the observed numbers take over.
+    """
+
+    POLICIES = ("ewma", "p2c")
+
+    def __init__(
+        self,
+        stats: ProviderStats,
+        policy: str = "p2c",
+        preference: float = 2.0,
+        default_latency: float = 1.0,
+        rng: Optional[random.Random] = None
+    ):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown load balancing policy: {policy}")
+
+        self.stats = stats
+        self.policy = policy
+        self.preference = preference
+        self.default_latency = default_latency
+        self._rng = rng or random.Random()
+
+        self.selections = 0
+        self.overrides = 0
+
+    def cost(self, provider: str, model: Optional[str] = None) -> float:
+        """
+        Expected cost of sending one more request to an endpoint
+
+        Args:
+            provider: Provider name
+            model: Model name (None for the provider default)
+
+        Returns:
+            Smoothed latency scaled by load and error rate
+        """
+        stats = self.stats.get(provider, model or "default")
+        if stats is None or stats.ewma_latency is None:
+            # Fall back to provider-wide observations for unseen models
+            stats = self.stats.get(provider) or stats
+
+        if stats is None:
+            # Optimistic for never-tried endpoints so they get explored once
+            return 0.0
+
+        latency = stats.ewma_latency if stats.ewma_latency is not None else self.default_latency
+        return latency * (stats.in_flight + 1) / max(0.05, 1.0 - stats.error_rate)
+
+    def choose(
+        self,
+        candidates: List[Endpoint],
+        preferred: Optional[Endpoint] = None,
+        preference: Optional[float] = None
+    ) -> Endpoint:
+        """
+        Pick an endpoint for the next request
+
+        Args:
+            candidates: Eligible (provider, model) endpoints
+            preferred: Endpoint suggested by static routing
+            preference: Cost discount for the preferred endpoint (defaults to self.preference)
+
+        Returns:
+            Selected (provider, model) endpoint
+        """
+        if not candidates:
+            raise ValueError("No candidate endpoints to balance across")
+
+        self.selections += 1
+        preference = preference or self.preference
+
+        def weighted_cost(endpoint: Endpoint) -> float:
+            cost = self.cost(*endpoint)
+            return cost / preference if endpoint == preferred else cost
+
+        if self.policy == "p2c" and len(candidates) > 2:
+            first = preferred if preferred in candidates else self._rng.choice(candidates)
+            second = self._rng.choice([c for c in candidates if c != first])
+            pool = [first, second]
+        else:
+            pool = candidates
+
+        # min() keeps the first of equal-cost endpoints, so list the preferred one first
+        if preferred in pool:
+            pool = [preferred] + [c for c in pool if c != preferred]
+
+        choice = min(pool, key=weighted_cost)
+        if preferred is not None and choice != preferred:
+            self.overrides += 1
+        return choice
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get balancer statistics"""
+        return {
+            "policy": self.policy,
+            "selections": self.selections,
+            "overrides": self.overrides
+        }
@@ -0,0 +1,338 @@
+"""
+📊 Metrics Registry
+Log-bucketed latency histograms and counters, mergeable across workers
+"""
+
+import asyncio
+import glob
+import json
+import math
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+# Bucket layout shared by every histogram so snapshots merge by index
+_MIN_VALUE = 1e-4                  # 100µs
+_GROWTH = 2 ** (1 / 8)             # ~9% relative error per bucket
+_BUCKETS = 216                     # Upper bound ~1.3e4 seconds
+_INV_LOG_GROWTH = 1.0 / math.log(_GROWTH)
+_EXPORT_EVERY = 8                  # Prometheus buckets at powers of two
+
+QUANTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+def _upper_bound(index: int) -> float:
+    return _MIN_VALUE * _GROWTH ** index
+
+
+class LogHistogram:
+    """
+    Log-Bucketed Histogram
+
+    Values fall into geometrically growing buckets, so any percentile is
+    known to within one bucket (about 9%) at a cost of one logarithm and
+    one list increment per observation. All histograms share the same
+    layout, which makes merging a per-index sum.
+    """
+
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts: List[int] = [0] * (_BUCKETS + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record a value"""
+        if value <= _MIN_VALUE:
+            index = 0
+        else:
+            index = min(_BUCKETS, int(math.log(value / _MIN_VALUE) * _INV_LOG_GROWTH) + 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Get a percentile
+
+        Args:
+            q: Percentile in [0, 100]
+
+        Returns:
+            Upper bound of the bucket holding the percentile, or None when empty
+        """
+        if not self.count:
+            return None
+
+        rank = max(1, math.ceil(q / 100.0 * self.count))
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= rank:
+                return min(_upper_bound(index), self.max)
+        return self.max
+
+    def merge(self, other: "LogHistogram") -> None:
+        """Add another histogram's observations to this one"""
+        for index, bucket in enumerate(other.counts):
+            if bucket:
+                self.counts[index] += bucket
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Sparse, JSON-serializable form"""
+        return {
+            "counts": {str(i): c for i, c in enumerate(self.counts) if c},
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LogHistogram":
+        histogram = cls()
+        for index, bucket in data["counts"].items():
+            histogram.counts[int(index)] = bucket
+        histogram.count = data["count"]
+        histogram.sum = data["sum"]
+        histogram.max = data["max"]
+        return histogram
+
+    def summary(self) -> Dict[str, Any]:
+        """Count, mean and the standard percentiles"""
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else None,
+            **{f"p{q:g}".replace(".", ""): self.percentile(q) for q in QUANTILES}
+        }
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, Any]) -> LabelSet:
+    return tuple(sorted((k, "" if v is None else str(v)) for k, v in labels.items()))
+
+
+class MetricsRegistry:
+    """
+    Per-Worker Metrics Registry
+
+    Each worker process owns its registry and updates it without locks
+    (the event loop is single-threaded). When ``directory`` is set, the
+    registry periodically writes a snapshot file there; a scrape from any
+    worker merges all snapshot files so totals cover every process.
+    Snapshots not rewritten within ``stale_after`` seconds belong to dead
+    or restarted workers and are left out, and a worker removes its own
+    snapshot when it shuts down cleanly.
+    """
+
+    def __init__(self, directory: Optional[str] = None, stale_after: float = 30.0):
+        self.directory = directory
+        self.stale_after = stale_after
+        self.histograms: Dict[Tuple[str, LabelSet], LogHistogram] = {}
+        self.counters: Dict[Tuple[str, LabelSet], float] = {}
+        self.help: Dict[str, str] = {}
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def describe(self, name: str, text: str) -> None:
+        """Set the HELP text of a metric family"""
+        self.help[name] = text
+
+    def histogram(self, name: str, **labels) -> LogHistogram:
+        """Get (or create) the histogram for name and labels"""
+        key = (name, _labels(labels))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LogHistogram()
+        return histogram
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Record a value in a histogram"""
+        self.histogram(name, **labels).observe(value)
+
+    def inc(self, name: str, amount: float = 1.0, **labels) -> None:
+        """Increment a counter"""
+        key = (name, _labels(labels))
+        self.counters[key] = self.counters.get(key, 0.0) + amount
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable copy of all series"""
+        return {
+            "pid": os.getpid(),
+            "counters": [[name, dict(labels), value] for (name, labels), value in self.counters.items()],
+            "histograms": [
+                [name, dict(labels), histogram.to_dict()]
+                for (name, labels), histogram in self.histograms.items()
+            ]
+        }
+
+    def _snapshot_path(self) -> str:
+        return os.path.join(self.directory, f"worker-{os.getpid()}.json")
+
+    def flush(self) -> None:
+        """Write this worker's snapshot (atomically) to the shared directory"""
+        if not self.directory:
+            return
+        path = self._snapshot_path()
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)
+
+    def discard(self) -> None:
+        """Remove this worker's snapshot so other workers stop counting it"""
+        if not self.directory:
+            return
+        try:
+            os.remove(self._snapshot_path())
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Removing metrics snapshot failed: {e}")
+
+    async def run_flusher(self, interval: float = 5.0) -> None:
+        """Flush snapshots every interval seconds until cancelled, then remove ours"""
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    await asyncio.to_thread(self.flush)
+                except OSError as e:
+                    logger.warning(f"Metrics flush failed: {e}")
+        finally:
+            self.discard()
+
+    def _read_snapshots(self) -> List[Dict[str, Any]]:
+        """Other workers' snapshots, skipping stale and unreadable ones"""
+        snapshots = []
+        if not self.directory:
+            return snapshots
+
+        own = self._snapshot_path()
+        cutoff = time.time() - self.stale_after
+        for path in glob.glob(os.path.join(self.directory, "worker-*.json")):
+            if path == own:
+                continue
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    continue
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except FileNotFoundError:
+                continue  # Removed by a worker shutting down
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable metrics snapshot {path}: {e}")
+        return snapshots
+
+    def merged(self, snapshots: Optional[List[Dict[str, Any]]] = None) -> "MetricsRegistry":
+        """
+        Registry combining this worker's live series with other workers' snapshots
+
+        Args:
+            snapshots: Other workers' snapshots (read from the directory if None)
+        """
+        merged = MetricsRegistry()
+        merged.help = dict(self.help)
+        if snapshots is None:
+            snapshots = self._read_snapshots()
+        snapshots = [self.snapshot()] + snapshots
+
+        for snapshot in snapshots:
+            for name, labels, value in snapshot["counters"]:
+                merged.inc(name, value, **labels)
+            for name, labels, data in snapshot["histograms"]:
+                merged.histogram(name, **labels).merge(LogHistogram.from_dict(data))
+        return merged
+
+    async def amerged(self) -> "MetricsRegistry":
+        """``merged`` with the snapshot files read off the event loop"""
+        return self.merged(await asyncio.to_thread(self._read_snapshots))
+
+    # ------------------------------------------------------------------
+    # Exposition
+    # ------------------------------------------------------------------
+
+    def series(self, name: str) -> Iterable[Tuple[Dict[str, str], LogHistogram]]:
+        """All histograms of a family with their labels"""
+        for (family, labels), histogram in self.histograms.items():
+            if family == name:
+                yield dict(labels), histogram
+
+    def render_prometheus(self) -> str:
+        """Render all series in the Prometheus text exposition format"""
+        def fmt(labels: Iterable[Tuple[str, str]]) -> str:
+            pairs = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+            return f"{{{pairs}}}" if pairs else ""
+
+        lines: List[str] = []
+
+        def header(name: str, kind: str) -> None:
+            if name in self.help:
+                lines.append(f"# HELP {name} {self.help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        families: Dict[str, List[Tuple[LabelSet, float]]] = {}
+        for (name, labels), value in self.counters.items():
+            families.setdefault(name, []).append((labels, value))
+        for name in sorted(families):
+            header(name, "counter")
+            for labels, value in families[name]:
+                lines.append(f"{name}{fmt(labels)} {value:.17g}")
+
+        histogram_families: Dict[str, List[Tuple[LabelSet, LogHistogram]]] = {}
+        for (name, labels), histogram in self.histograms.items():
+            histogram_families.setdefault(name, []).append((labels, histogram))
+        for name in sorted(histogram_families):
+            header(name, "histogram")
+            for labels, histogram in histogram_families[name]:
+                cumulative = 0
+                for index, bucket in enumerate(histogram.counts):
+                    cumulative += bucket
+                    if index % _EXPORT_EVERY == 0 and index < _BUCKETS:
+                        le = (("le", f"{_upper_bound(index):.6g}"),)
+                        lines.append(f"{name}_bucket{fmt(labels + le)} {cumulative}")
+                lines.append(f'{name}_bucket{fmt(labels + (("le", "+Inf"),))} {histogram.count}')
+                lines.append(f"{name}_sum{fmt(labels)} {histogram.sum:.17g}")
+                lines.append(f"{name}_count{fmt(labels)} {histogram.count}")
+
+            # Fine-grained percentiles that the exported buckets are too coarse for
+            quantile_name = f"{name}_quantile"
+            lines.append(f"# TYPE {quantile_name} gauge")
+            for labels, histogram in histogram_families[name]:
+                for q in QUANTILES:
+                    value = histogram.percentile(q)
+                    if value is not None:
+                        ql = (("quantile", f"{q / 100:g}"),)
+                        lines.append(f"{quantile_name}{fmt(labels + ql)} {value:.6g}")
+
+        return "\n".join(lines) + "\n"
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Percentile summaries of every histogram and all counters"""
+        stats: Dict[str, Any] = {"histograms": {}, "counters": {}}
+        for (name, labels), histogram in self.histograms.items():
+            series = ",".join(f"{k}={v}" for k, v in labels)
+            stats["histograms"].setdefault(name, {})[series] = histogram.summary()
+        for (name, labels), value in self.counters.items():
+            series = ",".join(f"{k}={v}" for k, v in labels)
+            stats["counters"].setdefault(name, {})[series] = value
+        return stats
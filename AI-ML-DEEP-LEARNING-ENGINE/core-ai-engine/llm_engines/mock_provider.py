@@ -0,0 +1,179 @@
+"""
+🧪 Mock Provider
+Offline provider with configurable latency, throughput and failures
+"""
+
+import asyncio
+import os
+import random
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+_VOCABULARY = (
+    "the model considers each part of the request and answers with a short "
+    "synthetic completion that is useful for load testing only"
+).split()
+
+
+class MockProviderError(Exception):
+    """Injected provider failure carrying an HTTP-style status code"""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"Mock provider error {status_code}: {message}")
+        self.status_code = status_code
+
+
+@dataclass
+class MockProfile:
+    """Behaviour of the mock provider"""
+    latency_median: float = 0.2      # Time to first token, seconds (log-normal median)
+    latency_sigma: float = 0.5       # Log-normal shape; larger means a heavier tail
+    tokens_per_second: float = 80.0  # Generation throughput after the first token
+    completion_tokens: int = 64      # Tokens generated when max_tokens is larger
+    error_rate: float = 0.0          # Fraction of requests failing with 500
+    rate_limit_rate: float = 0.0     # Fraction of requests failing with 429
+    stall_rate: float = 0.0          # Fraction of streams stalling mid-way
+    seed: Optional[int] = None
+
+    @classmethod
+    def from_env(cls, prefix: str = "MOCK_PROVIDER_") -> "MockProfile":
+        """Build a profile from environment variables such as MOCK_PROVIDER_ERROR_RATE"""
+        values: Dict[str, Any] = {}
+        for name, default in cls().__dict__.items():
+            raw = os.getenv(prefix + name.upper())
+            if raw is None:
+                continue
+            kind = type(default) if default is not None else int
+            values[name] = kind(raw)
+        return cls(**values)
+
+
+class MockProvider:
+    """
+    Mock AI Provider
+
+    Implements the same client interface as the real wrappers (generate,
+    chat_completion, stream_chat_completion, close) without any network
+    access. Latency is drawn from a log-normal distribution, output is
+    paced at ``tokens_per_second``, and errors are injected at the
+    configured rates.
+    """
+
+    AVAILABLE_MODELS = {
+        "mock-small": "mock-small",
+        "mock-large": "mock-large",
+    }
+
+    def __init__(self, profile: Optional[MockProfile] = None, name: str = "mock"):
+        self.name = name
+        self.profile = profile or MockProfile()
+        self.base_url = None
+        self._rng = random.Random(self.profile.seed)
+
+        self.stats = {
+            "requests": 0,
+            "errors": 0,
+            "tokens": 0
+        }
+
+        logger.info(f"🧪 Mock provider '{name}' initialized")
+
+    def _first_token_delay(self) -> float:
+        return self._rng.lognormvariate(0.0, self.profile.latency_sigma) * self.profile.latency_median
+
+    def _maybe_fail(self) -> None:
+        roll = self._rng.random()
+        if roll < self.profile.rate_limit_rate:
+            self.stats["errors"] += 1
+            raise MockProviderError(429, "rate limited")
+        if roll < self.profile.rate_limit_rate + self.profile.error_rate:
+            self.stats["errors"] += 1
+            raise MockProviderError(500, "internal error")
+
+    def _tokens(self, messages: List[Dict[str, str]], max_tokens: Optional[int]) -> List[str]:
+        count = min(self.profile.completion_tokens, max_tokens or self.profile.completion_tokens)
+        seed_words = messages[-1]["content"].split()[:8] if messages else []
+        words = seed_words + [_VOCABULARY[i % len(_VOCABULARY)] for i in range(count)]
+        return [word + " " for word in words[:count]]
+
+    async def chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> str:
+        """Return a complete response after simulated latency"""
+        self.stats["requests"] += 1
+        await asyncio.sleep(self._first_token_delay())
+        self._maybe_fail()
+
+        tokens = self._tokens(messages, max_tokens)
+        await asyncio.sleep(len(tokens) / self.profile.tokens_per_second)
+        self.stats["tokens"] += len(tokens)
+        return "".join(tokens).strip()
+
+    async def generate(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        **kwargs
+    ) -> str:
+        """Return a complete response for a single prompt"""
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        return await self.chat_completion(messages, model=model, **kwargs)
+
+    async def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """Yield tokens at the configured rate"""
+        self.stats["requests"] += 1
+        await asyncio.sleep(self._first_token_delay())
+        self._maybe_fail()
+
+        tokens = self._tokens(messages, max_tokens)
+        stall_at = (
+            self._rng.randrange(1, len(tokens))
+            if len(tokens) > 1 and self._rng.random() < self.profile.stall_rate
+            else None
+        )
+
+        for i, token in enumerate(tokens):
+            if i == stall_at:
+                self.stats["errors"] += 1
+                raise MockProviderError(502, "stream interrupted")
+            if i:
+                await asyncio.sleep(1.0 / self.profile.tokens_per_second)
+            self.stats["tokens"] += 1
+            yield token
+
+    async def close(self) -> None:
+        """Nothing to release"""
+
+
+def get_mock_client(http_client: Any = None, **overrides) -> MockProvider:
+    """
+    Create a mock provider client
+
+    Args:
+        http_client: Accepted for interface parity with the real wrappers
+        **overrides: MockProfile fields overriding the environment
+
+    Returns:
+        Mock provider client
+    """
+    profile = MockProfile.from_env()
+    for name, value in overrides.items():
+        setattr(profile, name, value)
+    return MockProvider(profile)
@@ -4,23 +4,99 @@ Intelligent routing, load balancing, and failover across AI providers
 """
 
 import os
+import json
+import time
 import asyncio
-from typing import Optional, Dict, List, Any, AsyncGenerator
+import inspect
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Optional, Dict, List, Any, AsyncGenerator, Callable, Iterator, Tuple, Union
 from enum import Enum
 from pydantic import BaseModel, Field
 
-from .models.nvidia_wrapper import NVIDIAWrapper, get_nvidia_client
-from .models.sambanova_wrapper import SambaNovaWrapper, get_sambanova_client
-from .models.cerebras_wrapper import CerebrasWrapper, get_cerebras_client
+from .provider_registry import available_providers, get_provider_factory
+from .http_transport import HTTPTransport
+from .response_cache import ResponseCache, make_chat_cache_key
+from .single_flight import SingleFlight
+from .disk_cache import DiskCache
+from .semantic_cache import LEXICAL_MIN_THRESHOLD, SemanticCache, load_embed_fn
+from .provider_stats import ProviderStats
+from .load_balancer import LoadBalancer
+from .affinity import AffinityTable, prefix_keys
+from .cascade import AnswerVerifier, build_verifier
+from .task_classifier import TaskClassifier, TaskPrediction
+from .deadline import DeadlineExceeded, get_deadline, within_deadline
+from .shared_state import SharedState, create_shared_state
+from .circuit_breaker import CircuitBreaker
+from .rate_limiter import ProviderLimiter
+from .batcher import MicroBatcher
+from .scheduler import Priority, PriorityScheduler
+from .metrics import MetricsRegistry
+from .tokenizer import get_token_counter
+from .streaming import FirstTokenTimeout, StreamMetrics, coalesce
+from .retry import ErrorClass, RETRYABLE, RetryBudget, RetryPolicy, classify_error
+
+
+logger = logging.getLogger(__name__)
 
 
 class AIProvider(str, Enum):
-    """Supported AI Providers"""
+    """Supported AI Providers (plus any name in the provider registry)"""
     NVIDIA = "nvidia"
     SAMBANOVA = "sambanova"
     CEREBRAS = "cerebras"
     OPENAI = "openai"
     ANTHROPIC = "anthropic"
+    MOCK = "mock"
+    
+    @classmethod
+    def _missing_(cls, value):
+        # Providers added through register_provider or entry points get a
+        # member on first lookup, so they route like the built-in ones
+        if not isinstance(value, str) or value not in available_providers():
+            return None
+        member = str.__new__(cls, value)
+        member._name_ = value.upper()
+        member._value_ = value
+        return cls._value2member_map_.setdefault(value, member)
+
+
+class ProviderLimits(BaseModel):
+    """Admission limits for a provider or provider/model pair"""
+    max_concurrency: Optional[int] = Field(default=None, ge=1)
+    requests_per_minute: Optional[float] = Field(default=None, gt=0)
+    tokens_per_minute: Optional[float] = Field(default=None, gt=0)
+
+
+class TokenPricing(BaseModel):
+    """Price in USD per million tokens for a provider or provider/model pair"""
+    input_per_million: float = Field(default=0.0, ge=0.0)
+    output_per_million: float = Field(default=0.0, ge=0.0)
+
+
+class Completion(BaseModel):
+    """A generated answer and the endpoint that produced it"""
+    content: str
+    provider: Optional[str] = None
+    model: Optional[str] = None
+    cached: bool = False
+    
+    @classmethod
+    def decode(cls, value: str) -> "Completion":
+        """Parse a cache entry (entries written before endpoints were recorded are bare text)"""
+        if value.startswith('{"content"'):
+            try:
+                return cls.model_validate_json(value)
+            except ValueError:
+                pass
+        return cls(content=value)
+
+
+class OrchestratorDraining(Exception):
+    """Raised for new requests once the orchestrator is shutting down"""
+    
+    status_code = 503
 
 
 class OrchestratorConfig(BaseModel):
@@ -28,11 +104,139 @@ class OrchestratorConfig(BaseModel):
     default_provider: AIProvider = Field(
         default_factory=lambda: AIProvider(os.getenv("DEFAULT_AI_PROVIDER", "nvidia"))
     )
+    providers: List[str] = Field(
+        default_factory=lambda: [
+            name.strip()
+            for name in os.getenv("AI_PROVIDERS", "nvidia,sambanova,cerebras").split(",")
+            if name.strip()
+        ],
+        description="Providers to initialize, in fallback order"
+    )
     enable_fallback: bool = Field(default=True)
     enable_load_balancing: bool = Field(default=True)
+    load_balancing_policy: str = Field(default="p2c", description="p2c or ewma")
+    load_balancing_preference: float = Field(default=2.0, ge=1.0)
+    enable_prefix_affinity: bool = Field(default=True)
+    affinity_min_prefix_chars: int = Field(default=2048, ge=1)
+    affinity_preference: float = Field(default=4.0, ge=1.0)
+    affinity_ttl: float = Field(default=600.0, gt=0)
+    affinity_max_entries: int = Field(default=10000, ge=1)
     enable_caching: bool = Field(default=True)
+    enable_coalescing: bool = Field(default=True)
+    cache_max_entries: int = Field(default=10000)
+    cache_max_bytes: int = Field(default=64 * 1024 * 1024)
+    cache_ttl: float = Field(default=3600.0)
+    enable_disk_cache: bool = Field(default=False)
+    disk_cache_path: str = Field(
+        default_factory=lambda: os.getenv("AI_ENGINE_DISK_CACHE_PATH", ".cache/responses.db")
+    )
+    disk_cache_max_bytes: int = Field(default=512 * 1024 * 1024)
+    disk_cache_ttl: float = Field(default=86400.0)
+    disk_cache_compact_every: int = Field(default=100)
+    enable_semantic_cache: bool = Field(
+        default_factory=lambda: os.getenv("AI_ENGINE_SEMANTIC_CACHE", "false").lower() == "true"
+    )
+    semantic_cache_threshold: float = Field(
+        default_factory=lambda: float(os.getenv("AI_ENGINE_SEMANTIC_THRESHOLD", LEXICAL_MIN_THRESHOLD)),
+        ge=0.0, le=1.0,
+        description="Lower values need a semantic embedder"
+    )
+    semantic_cache_embedder: Optional[str] = Field(
+        default_factory=lambda: os.getenv("AI_ENGINE_SEMANTIC_EMBEDDER") or None,
+        description="Import path (module:attribute) of a text embedding function"
+    )
+    semantic_cache_embedding_dim: int = Field(
+        default_factory=lambda: int(os.getenv("AI_ENGINE_SEMANTIC_EMBEDDING_DIM", "384")),
+        ge=1,
+        description="Vector size returned by the embedder"
+    )
+    semantic_cache_max_entries: int = Field(default=5000)
+    semantic_cache_task_types: List[str] = Field(
+        default_factory=list,
+        description="Task types smart_route serves from the semantic cache"
+    )
+    enable_cascade: bool = Field(default=False)
+    cascade_task_types: List[str] = Field(default_factory=lambda: ["general"])
+    cascade_provider: AIProvider = Field(default=AIProvider.NVIDIA)
+    cascade_model: Optional[str] = Field(default="nvidia/nvidia-nemotron-nano-9b-v2")
+    cascade_verifier: str = Field(default="heuristic", description="heuristic or judge")
+    cascade_threshold: float = Field(default=0.6, ge=0.0, le=1.0, description="Minimum verifier score to keep the cheap answer")
+    cascade_judge_provider: Optional[AIProvider] = Field(default=None, description="Judge provider (defaults to cascade_provider)")
+    cascade_judge_model: Optional[str] = Field(default=None, description="Judge model (defaults to cascade_model)")
+    cascade_max_predicted_tokens: Optional[int] = Field(default=1024, ge=1, description="Skip the cascade for longer predicted answers")
+    enable_task_classifier: bool = Field(default=True, description="Infer missing or unknown smart-route task types")
+    task_classifier_path: Optional[str] = Field(
+        default_factory=lambda: os.getenv("AI_ENGINE_TASK_CLASSIFIER") or None,
+        description="Trained classifier (.npz); the built-in seed model is used otherwise"
+    )
+    task_classifier_min_confidence: float = Field(default=0.3, ge=0.0, le=1.0)
+    routing_log_path: Optional[str] = Field(
+        default_factory=lambda: os.getenv("AI_ENGINE_ROUTING_LOG") or None,
+        description="JSONL log of routed prompts for offline classifier training"
+    )
+    enable_hedging: bool = Field(default=False)
+    hedge_percentile: float = Field(default=95.0, gt=0.0, le=100.0)
+    hedge_min_samples: int = Field(default=20)
+    hedge_delay: float = Field(default=2.0)
+    enable_circuit_breakers: bool = Field(default=True)
+    breaker_failure_threshold: int = Field(default=5)
+    breaker_recovery_timeout: float = Field(default=30.0)
+    breaker_half_open_probes: int = Field(default=1)
+    breaker_success_threshold: int = Field(default=2)
+    provider_limits: Dict[str, ProviderLimits] = Field(
+        default_factory=dict,
+        description='Limits keyed by "provider" or "provider/model"'
+    )
+    limiter_max_wait: float = Field(default=5.0, ge=0.0)
+    provider_pricing: Dict[str, TokenPricing] = Field(
+        default_factory=dict,
+        description='Token prices keyed by "provider" or "provider/model"'
+    )
+    enable_scheduler: bool = Field(default=True)
+    scheduler_max_concurrency: int = Field(default=64, ge=1)
+    scheduler_max_queue: int = Field(default=1000, ge=0)
+    scheduler_class_weights: Dict[str, float] = Field(
+        default_factory=lambda: {"interactive": 8.0, "default": 4.0, "batch": 1.0}
+    )
+    enable_batching: bool = Field(default=False)
+    batch_max_size: int = Field(default=8, ge=1)
+    batch_max_wait: float = Field(default=0.005, ge=0.0)
+    enable_shared_transport: bool = Field(default=True)
+    http2: bool = Field(default=True)
+    http_max_connections: int = Field(default=100, ge=1)
+    http_max_keepalive_connections: int = Field(default=20, ge=0)
+    http_keepalive_expiry: float = Field(default=30.0)
+    stream_flush_interval: float = Field(default=0.02, ge=0.0, description="Chunk coalescing window in seconds (0 disables)")
+    stream_flush_bytes: int = Field(default=1024, ge=1)
+    stream_replay_chunk_size: int = Field(default=64, ge=1, description="Characters per chunk when replaying cached streams")
+    stream_ttft_timeout: Optional[float] = Field(default=30.0, gt=0, description="Fail over if no chunk arrives in time")
+    enable_stream_resume: bool = Field(default=False)
+    stream_max_resumes: int = Field(default=1, ge=0)
+    stream_resume_prompt: str = Field(
+        default="Continue your previous answer exactly where it stopped. "
+                "Do not repeat any text that was already written."
+    )
+    metrics_dir: Optional[str] = Field(
+        default_factory=lambda: os.getenv("AI_ENGINE_METRICS_DIR") or None,
+        description="Directory where workers share metrics snapshots"
+    )
+    metrics_flush_interval: float = Field(default=5.0, gt=0)
+    shared_state_url: Optional[str] = Field(
+        default_factory=lambda: os.getenv("AI_ENGINE_SHARED_STATE") or None,
+        description="sqlite:///path (same host, e.g. on /dev/shm) or redis://host:port/db"
+    )
+    shared_state_sync_interval: float = Field(default=1.0, gt=0, description="How often breaker trips from other workers are picked up")
+    drain_timeout: float = Field(default=30.0, ge=0, description="Seconds shutdown waits for in-flight requests")
     max_retries: int = Field(default=3)
-    timeout: float = Field(default=300.0)
+    retry_base_delay: float = Field(default=0.5)
+    retry_max_delay: float = Field(default=8.0)
+    retry_budget_ratio: float = Field(default=0.1, ge=0.0)
+    retry_budget_min_per_second: float = Field(default=1.0, ge=0.0)
+    timeout: float = Field(default=300.0, description="Upper bound on any request's deadline, in seconds")
+    deadline_latency_percentile: Optional[float] = Field(
+        default=10.0, gt=0.0, le=100.0,
+        description="Skip providers whose observed latency at this percentile exceeds the remaining budget"
+    )
 
 
 class ModelOrchestrator:
@@ -48,46 +252,350 @@ class ModelOrchestrator:
     - Performance monitoring
     """
     
-    def __init__(self, config: Optional[OrchestratorConfig] = None):
-        """Initialize the orchestrator with configuration"""
+    def __init__(
+        self,
+        config: Optional[OrchestratorConfig] = None,
+        embed_fn: Optional[Callable[[str], Any]] = None
+    ):
+        """
+        Initialize the orchestrator with configuration
+        
+        Args:
+            config: Orchestrator configuration
+            embed_fn: Text embedding model for the semantic cache (defaults
+                to config.semantic_cache_embedder, then to a lexical
+                embedding that only matches near-exact repeats)
+        """
         self.config = config or OrchestratorConfig()
         
+        # Shared connection pool for all provider clients
+        self.transport: Optional[HTTPTransport] = None
+        if self.config.enable_shared_transport:
+            self.transport = HTTPTransport(
+                max_connections=self.config.http_max_connections,
+                max_keepalive_connections=self.config.http_max_keepalive_connections,
+                keepalive_expiry=self.config.http_keepalive_expiry,
+                http2=self.config.http2,
+                read_timeout=self.config.timeout
+            )
+        
+        # Cache entries, rate limits and breaker trips shared with other workers
+        self.shared: Optional[SharedState] = None
+        if self.config.shared_state_url:
+            self.shared = create_shared_state(self.config.shared_state_url)
+        
         # Initialize provider clients
         self.providers: Dict[AIProvider, Any] = {}
         self._init_providers()
         
+        # Per-provider circuit breakers
+        self._breakers: Dict[AIProvider, CircuitBreaker] = {
+            provider: CircuitBreaker(
+                provider.value,
+                failure_threshold=self.config.breaker_failure_threshold,
+                recovery_timeout=self.config.breaker_recovery_timeout,
+                half_open_max_probes=self.config.breaker_half_open_probes,
+                success_threshold=self.config.breaker_success_threshold,
+                on_open=self._publish_breaker_trip if self.shared else None
+            )
+            for provider in self.providers
+        }
+        
         # Performance tracking
         self.metrics: Dict[str, Any] = {
             "requests_count": 0,
             "success_count": 0,
             "error_count": 0,
-            "provider_usage": {provider.value: 0 for provider in AIProvider},
-            "average_latency": 0.0
+            "provider_usage": {provider.value: 0 for provider in self.providers},
+            "average_latency": 0.0,
+            "hedged_requests": 0,
+            "hedge_wins": 0,
+            "retries": 0,
+            "errors_by_class": {},
+            "fan_outs": 0,
+            "fan_out_stragglers": 0,
+            "classified_prompts": 0,
+            "deadline_exceeded": 0,
+            "deadline_skips": 0
+        }
+        # Fan-out stragglers and other fire-and-forget work
+        self._background: set = set()
+        
+        # Lifecycle: long-running service tasks and in-flight request tracking
+        self.started = False
+        self._services: List[asyncio.Task] = []
+        self._active = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._draining = False
+        self.registry = MetricsRegistry(
+            self.config.metrics_dir,
+            stale_after=3 * self.config.metrics_flush_interval
+        )
+        self.registry.describe("ai_inference_duration_seconds", "Latency of successful provider calls")
+        self.registry.describe("ai_request_duration_seconds", "End-to-end generation latency including retries")
+        self.registry.describe("ai_requests_total", "Provider calls by outcome")
+        self.registry.describe("ai_errors_total", "Failed attempts by error class")
+        self.registry.describe("ai_affinity_lookups_total", "Prefix affinity routing outcomes")
+        self.registry.describe("ai_prompt_tokens_total", "Prompt tokens sent to providers")
+        self.registry.describe("ai_completion_tokens_total", "Tokens generated by providers")
+        self.registry.describe("ai_cost_usd_total", "Estimated spend from configured token prices")
+        self.registry.describe("ai_output_tokens_per_second", "Generation throughput per request")
+        self.registry.describe("ai_cascade_requests_total", "Cascade outcomes: accepted, escalated or fast_failed")
+        self.registry.describe("ai_cascade_latency_saved_seconds_total", "Latency saved by accepted cheap answers")
+        self.registry.describe("ai_cascade_latency_overhead_seconds_total", "Latency added by escalated cheap attempts")
+        self.registry.describe("ai_cascade_cost_saved_usd_total", "Spend saved by accepted cheap answers")
+        self.registry.describe("ai_cascade_cost_overhead_usd_total", "Spend on cheap attempts that escalated")
+        self.tokens = get_token_counter()
+        self._limiters: Dict[str, ProviderLimiter] = {
+            key: ProviderLimiter(
+                key,
+                max_concurrency=limits.max_concurrency,
+                requests_per_minute=limits.requests_per_minute,
+                tokens_per_minute=limits.tokens_per_minute,
+                max_wait=self.config.limiter_max_wait,
+                shared=self.shared
+            )
+            for key, limits in self.config.provider_limits.items()
+        }
+        self._scheduler: Optional[PriorityScheduler] = None
+        if self.config.enable_scheduler:
+            self._scheduler = PriorityScheduler(
+                max_concurrency=self.config.scheduler_max_concurrency,
+                class_weights=self.config.scheduler_class_weights,
+                max_queue=self.config.scheduler_max_queue
+            )
+        self._batcher: Optional[MicroBatcher] = None
+        if self.config.enable_batching:
+            self._batcher = MicroBatcher(
+                self._dispatch_batch,
+                max_batch_size=self.config.batch_max_size,
+                max_wait=self.config.batch_max_wait
+            )
+        self._retry_policy = RetryPolicy(
+            max_retries=self.config.max_retries,
+            base_delay=self.config.retry_base_delay,
+            max_delay=self.config.retry_max_delay
+        )
+        self._retry_budget = RetryBudget(
+            ratio=self.config.retry_budget_ratio,
+            min_per_second=self.config.retry_budget_min_per_second
+        )
+        self._provider_stats = ProviderStats()
+        self._load_balancer = LoadBalancer(
+            self._provider_stats,
+            policy=self.config.load_balancing_policy,
+            preference=self.config.load_balancing_preference,
+            default_latency=self.config.hedge_delay
+        )
+        
+        # Sticky routing of shared prompt prefixes
+        self._affinity: Optional[AffinityTable] = None
+        if self.config.enable_prefix_affinity:
+            self._affinity = AffinityTable(
+                max_entries=self.config.affinity_max_entries,
+                ttl=self.config.affinity_ttl
+            )
+        
+        # Cheap-first cascade for smart routing
+        self._verifier: AnswerVerifier = build_verifier(self.config.cascade_verifier, judge=self._judge)
+        self._cascade_stats = {
+            "requests": 0,
+            "accepted": 0,
+            "escalated": 0,
+            "fast_failed": 0,
+            "latency_saved": 0.0,
+            "latency_overhead": 0.0,
+            "cost_saved": 0.0,
+            "cost_overhead": 0.0
         }
         
-        # Simple cache
-        self._cache: Dict[str, str] = {}
+        # Task classifier (built on first use) and its training log
+        self._classifier: Optional[TaskClassifier] = None
+        self._routing_log = None
+        self._routing_log_lock = threading.Lock()
+        self._routing_log_closed = False
+        self._routing_writes: set = set()
+        
+        # Response cache
+        self._cache = ResponseCache(
+            max_entries=self.config.cache_max_entries,
+            max_bytes=self.config.cache_max_bytes,
+            default_ttl=self.config.cache_ttl
+        )
+        
+        # Optional persistent tier shared between workers
+        self._disk_cache: Optional[DiskCache] = None
+        if self.config.enable_disk_cache:
+            self._disk_cache = DiskCache(
+                self.config.disk_cache_path,
+                max_bytes=self.config.disk_cache_max_bytes,
+                default_ttl=self.config.disk_cache_ttl,
+                compact_every=self.config.disk_cache_compact_every
+            )
+        
+        # Optional near-duplicate prompt cache
+        self._semantic_cache: Optional[SemanticCache] = None
+        if self.config.enable_semantic_cache:
+            if embed_fn is None and self.config.semantic_cache_embedder:
+                embed_fn = load_embed_fn(self.config.semantic_cache_embedder)
+            self._semantic_cache = SemanticCache(
+                embedding_dim=self.config.semantic_cache_embedding_dim,
+                threshold=self.config.semantic_cache_threshold,
+                max_entries=self.config.semantic_cache_max_entries,
+                ttl=self.config.cache_ttl,
+                embed_fn=embed_fn
+            )
+        
+        # In-flight request coalescing
+        self._inflight = SingleFlight()
+        
+        # Time-to-first-token and inter-token latency of streams
+        self.stream_metrics = StreamMetrics(self.registry)
         
     def _init_providers(self):
-        """Initialize available AI provider clients"""
-        try:
-            self.providers[AIProvider.NVIDIA] = get_nvidia_client()
-        except Exception as e:
-            print(f"Warning: NVIDIA client initialization failed: {e}")
+        """Initialize the configured AI provider clients from the registry"""
+        for name in self.config.providers:
+            try:
+                factory = get_provider_factory(name)
+            except KeyError:
+                print(f"Warning: Unknown provider '{name}' skipped")
+                continue
             
-        try:
-            self.providers[AIProvider.SAMBANOVA] = get_sambanova_client()
-        except Exception as e:
-            print(f"Warning: SambaNova client initialization failed: {e}")
+            try:
+                self.providers[AIProvider(name)] = factory(**self._client_kwargs(factory))
+            except Exception as e:
+                print(f"Warning: {name} client initialization failed: {e}")
+    
+    def _client_kwargs(self, factory) -> Dict[str, Any]:
+        """Hand the shared HTTP client to factories that accept one"""
+        if not self.transport:
+            return {}
+        
+        params = inspect.signature(factory).parameters.values()
+        if any(p.name == "http_client" or p.kind == p.VAR_KEYWORD for p in params):
+            return {"http_client": self.transport.client}
+        
+        print(f"Warning: {factory.__name__} does not accept http_client; it keeps its own connection pool")
+        return {}
+    
+    async def start(self) -> None:
+        """
+        Warm connections and start background services
+        
+        Starts the metrics snapshot flusher (with a metrics directory) and
+        the shared-state sync (with shared state). Idempotent.
+        """
+        if self.started:
+            return
+        self.started = True
+        
+        # Pay DNS/TLS setup before the first request
+        warmed = await self.warm_up()
+        if warmed:
+            print(f"🔥 Pre-warmed connections to {sum(warmed.values())}/{len(warmed)} provider hosts")
+        
+        if self.registry.directory:
+            self._services.append(asyncio.create_task(
+                self.registry.run_flusher(self.config.metrics_flush_interval)
+            ))
+        if self.shared:
+            self._services.append(asyncio.create_task(
+                self.run_state_sync(self.config.shared_state_sync_interval)
+            ))
+    
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Stop admitting requests and wait for in-flight ones to finish
+        
+        Args:
+            timeout: Longest wait in seconds (defaults to config.drain_timeout)
             
+        Returns:
+            Whether every in-flight request finished in time
+        """
+        self._draining = True
+        timeout = self.config.drain_timeout if timeout is None else timeout
+        if self._active:
+            print(f"⏳ Draining {self._active} in-flight requests...")
         try:
-            self.providers[AIProvider.CEREBRAS] = get_cerebras_client()
-        except Exception as e:
-            print(f"Warning: Cerebras client initialization failed: {e}")
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"Drain timed out with {self._active} requests still in flight")
+            return False
+    
+    @contextmanager
+    def _track(self) -> Iterator[None]:
+        """Count a request as in flight; rejects new requests while draining"""
+        if self._draining:
+            raise OrchestratorDraining("Orchestrator is shutting down")
+        self._active += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self._active -= 1
+            if not self._active:
+                self._idle.set()
+    
+    def _spawn(self, coro) -> asyncio.Task:
+        """Run fire-and-forget work, keeping a reference until it finishes"""
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+    
+    def _publish_breaker_trip(self, breaker: CircuitBreaker) -> None:
+        """Tell other workers that a provider's breaker opened here"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        until = time.time() + breaker.recovery_timeout
+        self._spawn(self.shared.set(f"breaker:{breaker.name}", repr(until), ttl=breaker.recovery_timeout))
+    
+    async def run_state_sync(self, interval: float = 1.0) -> None:
+        """Open local breakers that other workers have tripped, until cancelled"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                for provider, breaker in self._breakers.items():
+                    value = await self.shared.get(f"breaker:{provider.value}")
+                    if value is not None:
+                        breaker.trip(float(value) - time.time())
+            except Exception as e:
+                # A backend hiccup must not end syncing for the worker's lifetime
+                logger.warning(f"Shared breaker sync failed: {e!r}")
+    
+    async def warm_up(self) -> Dict[str, bool]:
+        """
+        Pre-open pooled connections to every provider host
+        
+        Returns:
+            Mapping of base URL to whether a connection was established
+        """
+        if not self.transport:
+            return {}
+        
+        urls = [str(getattr(client, "base_url", "") or "") for client in self.providers.values()]
+        return await self.transport.warm_up(urls)
     
-    def _get_cache_key(self, prompt: str, provider: AIProvider, model: Optional[str]) -> str:
-        """Generate cache key for request"""
-        return f"{provider.value}:{model}:{hash(prompt)}"
+    def _get_cache_key(
+        self,
+        messages: List[Dict[str, str]],
+        provider: Optional[AIProvider],
+        model: Optional[str],
+        **kwargs
+    ) -> str:
+        """
+        Generate cache key for request
+        
+        Keyed on the route the caller asked for, not the endpoint picked by
+        balancing or affinity, so an unpinned prompt has one cache entry and
+        one in-flight call whichever provider ends up serving it.
+        """
+        return make_chat_cache_key(provider.value if provider else "auto", model, messages, **kwargs)
     
     async def generate(
         self,
@@ -96,6 +604,9 @@ class ModelOrchestrator:
         model: Optional[str] = None,
         system_prompt: Optional[str] = None,
         use_cache: bool = True,
+        use_semantic_cache: bool = False,
+        priority: str = Priority.DEFAULT.value,
+        tenant: Optional[str] = None,
         **kwargs
     ) -> str:
         """
@@ -107,240 +618,1651 @@ class ModelOrchestrator:
             model: Specific model to use
             system_prompt: Optional system prompt
             use_cache: Whether to use response cache
+            use_semantic_cache: Whether to match near-duplicate prompts
+            priority: Admission class (interactive, default, batch)
+            tenant: Tenant identifier for fair sharing within a class
             
         Returns:
             Generated text
         """
-        provider = provider or self.config.default_provider
-        
-        # Check cache
-        if use_cache and self.config.enable_caching:
-            cache_key = self._get_cache_key(prompt, provider, model)
-            if cache_key in self._cache:
-                return self._cache[cache_key]
-        
-        # Track request
-        self.metrics["requests_count"] += 1
-        self.metrics["provider_usage"][provider.value] += 1
-        
-        import time
-        start_time = time.time()
-        
-        try:
-            # Get provider client
-            client = self.providers.get(provider)
-            if not client:
-                raise Exception(f"Provider {provider.value} not initialized")
-            
-            # Generate response
-            response = await client.generate(
-                prompt=prompt,
-                model=model,
-                system_prompt=system_prompt,
-                **kwargs
-            )
-            
-            # Update metrics
-            latency = time.time() - start_time
-            self.metrics["success_count"] += 1
-            self.metrics["average_latency"] = (
-                (self.metrics["average_latency"] * (self.metrics["success_count"] - 1) + latency)
-                / self.metrics["success_count"]
-            )
-            
-            # Cache response
-            if use_cache and self.config.enable_caching:
-                cache_key = self._get_cache_key(prompt, provider, model)
-                self._cache[cache_key] = response
-            
-            return response
-            
-        except Exception as e:
-            self.metrics["error_count"] += 1
-            
-            # Attempt failover if enabled
-            if self.config.enable_fallback:
-                return await self._failover_generate(prompt, provider, model, system_prompt, **kwargs)
-            
-            raise Exception(f"Generation failed: {str(e)}")
+        return await self.chat(
+            self._build_messages(prompt, system_prompt),
+            provider=provider,
+            model=model,
+            use_cache=use_cache,
+            use_semantic_cache=use_semantic_cache,
+            priority=priority,
+            tenant=tenant,
+            **kwargs
+        )
     
-    async def _failover_generate(
+    async def chat(
         self,
-        prompt: str,
-        failed_provider: AIProvider,
-        model: Optional[str],
-        system_prompt: Optional[str],
+        messages: List[Dict[str, str]],
+        provider: Optional[AIProvider] = None,
+        model: Optional[str] = None,
+        use_cache: bool = True,
+        use_semantic_cache: bool = False,
+        priority: str = Priority.DEFAULT.value,
+        tenant: Optional[str] = None,
         **kwargs
     ) -> str:
         """
-        Attempt to generate using alternative providers
+        Complete a conversation and return the generated text
+        
+        See ``complete_chat`` for the arguments.
+        """
+        completion = await self.complete_chat(
+            messages,
+            provider=provider,
+            model=model,
+            use_cache=use_cache,
+            use_semantic_cache=use_semantic_cache,
+            priority=priority,
+            tenant=tenant,
+            **kwargs
+        )
+        return completion.content
+    
+    async def complete_chat(
+        self,
+        messages: List[Dict[str, str]],
+        provider: Optional[AIProvider] = None,
+        model: Optional[str] = None,
+        use_cache: bool = True,
+        use_semantic_cache: bool = False,
+        priority: str = Priority.DEFAULT.value,
+        tenant: Optional[str] = None,
+        **kwargs
+    ) -> Completion:
+        """
+        Complete a conversation using the specified or default AI provider
+        
+        Messages are forwarded unchanged and in order, so providers with
+        prompt-prefix caching can reuse the shared history of multi-turn
+        requests. The response cache is keyed on the whole conversation.
         
         Args:
-            prompt: User prompt
-            failed_provider: Provider that failed
+            messages: Chat messages (role and content), oldest first
+            provider: AI provider to use (defaults to config.default_provider)
             model: Specific model to use
-            system_prompt: Optional system prompt
+            use_cache: Whether to use response cache
+            use_semantic_cache: Whether to match near-duplicate final messages
+            priority: Admission class (interactive, default, batch)
+            tenant: Tenant identifier for fair sharing within a class
             
         Returns:
-            Generated text from alternative provider
+            The completion, with the provider and model that actually served
+            it (after balancing, affinity, hedging or failover)
         """
-        # Try other providers in order
-        fallback_order = [
-            AIProvider.NVIDIA,
-            AIProvider.SAMBANOVA,
-            AIProvider.CEREBRAS
-        ]
+        if not messages:
+            raise ValueError("At least one message is required")
         
-        for provider in fallback_order:
-            if provider != failed_provider and provider in self.providers:
-                try:
-                    print(f"Attempting failover to {provider.value}...")
-                    return await self.generate(
-                        prompt,
-                        provider=provider,
-                        model=None,  # Use default model for fallback
-                        system_prompt=system_prompt,
-                        use_cache=False,
-                        **kwargs
-                    )
-                except Exception as e:
-                    print(f"Failover to {provider.value} failed: {e}")
-                    continue
+        with self._track():
+            return await self._chat(
+                messages, provider, model, use_cache, use_semantic_cache, priority, tenant, **kwargs
+            )
+    
+    async def _chat(
+        self,
+        messages: List[Dict[str, str]],
+        provider: Optional[AIProvider],
+        model: Optional[str],
+        use_cache: bool,
+        use_semantic_cache: bool,
+        priority: str,
+        tenant: Optional[str],
+        **kwargs
+    ) -> Completion:
+        """Cache lookup, coalescing and scheduling around one chat completion"""
+        cache_key = self._get_cache_key(messages, provider, model, **kwargs)
+        
+        # Check cache
+        use_cache = use_cache and self.config.enable_caching
+        if use_cache:
+            cached = await self._cached_response(cache_key)
+            if cached is not None:
+                return cached
+        
+        # Near-duplicate final messages share answers within the same conversation
+        semantic_namespace = None
+        last_message = messages[-1].get("content") or ""
+        if use_cache and use_semantic_cache and self._semantic_cache:
+            semantic_namespace = self._get_cache_key(messages[:-1], provider, model, **kwargs)
+            cached = self._semantic_cache.lookup(last_message, semantic_namespace)
+            if cached is not None:
+                return Completion.decode(cached).model_copy(update={"cached": True})
+        
+        # Coalesce identical in-flight requests; the endpoint is picked only
+        # once a call is actually dispatched
+        def upstream():
+            return self._scheduled(
+                priority,
+                tenant,
+                lambda: self._generate_uncached(
+                    messages,
+                    *self._route(messages, provider, model),
+                    cache_key if use_cache else None,
+                    **kwargs
+                )
+            )
         
-        raise Exception("All providers failed")
+        # Each caller's wait is bounded by its own deadline. A coalesced upstream
+        # call is shared, so it runs under config.timeout alone and is cancelled
+        # only once every waiter has given up; an uncoalesced one keeps the
+        # caller's deadline and is rejected before it takes a scheduler slot
+        try:
+            if self.config.enable_coalescing:
+                response = await within_deadline(self._inflight.do(cache_key, upstream))
+            else:
+                response = await within_deadline(upstream())
+        except DeadlineExceeded:
+            self.metrics["deadline_exceeded"] += 1
+            raise
+        
+        if semantic_namespace:
+            self._semantic_cache.add(last_message, response.model_dump_json(exclude={"cached"}), semantic_namespace)
+        
+        return response
     
-    async def stream_generate(
+    async def _cached_response(self, cache_key: str) -> Optional[Completion]:
+        """Look up a response in memory, then on disk, then in shared state (promoting hits)"""
+        cached = self._cache.get(cache_key)
+        
+        if cached is None and self._disk_cache:
+            cached = await self._disk_cache.aget(cache_key)
+            if cached is not None:
+                self._cache.set(cache_key, cached)
+        
+        if cached is None and self.shared:
+            cached = await self.shared.get(f"cache:{cache_key}")
+            if cached is not None:
+                self._cache.set(cache_key, cached)
+        
+        if cached is None:
+            return None
+        return Completion.decode(cached).model_copy(update={"cached": True})
+    
+    async def _store_response(self, cache_key: str, completion: Completion) -> None:
+        """Write a response to every exact-match cache tier"""
+        response = completion.model_dump_json(exclude={"cached"})
+        self._cache.set(cache_key, response)
+        if self._disk_cache:
+            await self._disk_cache.aset(cache_key, response)
+        if self.shared:
+            await self.shared.set(f"cache:{cache_key}", response, ttl=self.config.cache_ttl)
+    
+    async def _scheduled(self, priority: str, tenant: Optional[str], fn):
+        """Run upstream work once the scheduler grants a dispatch slot"""
+        if not self._scheduler:
+            return await fn()
+        
+        async with self._scheduler.slot(priority, tenant):
+            return await fn()
+    
+    async def _generate_uncached(
         self,
-        prompt: str,
-        provider: Optional[AIProvider] = None,
-        model: Optional[str] = None,
-        system_prompt: Optional[str] = None,
+        messages: List[Dict[str, str]],
+        provider: AIProvider,
+        model: Optional[str],
+        cache_key: Optional[str],
         **kwargs
-    ) -> AsyncGenerator[str, None]:
+    ) -> Completion:
         """
-        Stream text generation from AI provider
+        Call the provider, retrying and falling back to alternatives on failure
+        
+        Retryable errors move on to the next fallback provider; once every
+        candidate has been tried, further retries back off with jitter.
+        Retries are bounded by config.max_retries and the global retry
+        budget. The request deadline (the caller's, capped at
+        config.timeout) spans all attempts, and providers that cannot
+        answer within the remaining budget are skipped.
         
         Args:
-            prompt: User prompt
+            messages: Chat messages
             provider: AI provider to use
             model: Specific model to use
-            system_prompt: Optional system prompt
+            cache_key: Key to store the response under (None to skip caching)
             
-        Yields:
-            Chunks of generated text
+        Returns:
+            The completion and the endpoint that served it
         """
-        provider = provider or self.config.default_provider
-        client = self.providers.get(provider)
+        # Track request
+        self.metrics["requests_count"] += 1
+        self._retry_budget.record_request()
         
-        if not client:
-            raise Exception(f"Provider {provider.value} not initialized")
+        start_time = time.time()
+        deadline = self._request_deadline()
+        candidates = self._retry_candidates(provider)
+        tried = set()
+        current, current_model = provider, model
+        attempt = 0
         
-        messages = []
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        messages.append({"role": "user", "content": prompt})
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded("Request deadline exceeded")
+            current, current_model = self._feasible(current, current_model, candidates, tried, remaining)
+            
+            tried.add(current)
+            self.metrics["provider_usage"][current.value] += 1
+            
+            try:
+                if self.config.enable_hedging:
+                    attempt_coro = self._hedged_generate(messages, current, current_model, **kwargs)
+                    response, served, served_model = await asyncio.wait_for(attempt_coro, timeout=remaining)
+                else:
+                    attempt_coro = self._call_provider(messages, current, current_model, **kwargs)
+                    response = await asyncio.wait_for(attempt_coro, timeout=remaining)
+                    served, served_model = current, current_model
+                break
+                
+            except Exception as e:
+                next_provider, delay = self._plan_retry(e, current, candidates, tried, attempt, deadline)
+                if next_provider != current:
+                    current_model = None  # Use default model for fallback
+                current = next_provider
+                attempt += 1
+                if delay:
+                    await asyncio.sleep(delay)
+        
+        # Update metrics
+        latency = time.time() - start_time
+        self.metrics["success_count"] += 1
+        self.metrics["average_latency"] = (
+            (self.metrics["average_latency"] * (self.metrics["success_count"] - 1) + latency)
+            / self.metrics["success_count"]
+        )
+        self.registry.observe(
+            "ai_request_duration_seconds", latency, provider=served.value, model=served_model or "default"
+        )
+        
+        completion = Completion(content=response, provider=served.value, model=served_model)
+        if cache_key:
+            await self._store_response(cache_key, completion)
         
-        async for chunk in client.stream_chat_completion(messages, model=model, **kwargs):
-            yield chunk
+        return completion
     
-    async def multi_provider_generate(
+    def _request_deadline(self) -> float:
+        """Monotonic deadline of the current request, capped at config.timeout"""
+        deadline = time.monotonic() + self.config.timeout
+        request_deadline = get_deadline()
+        return deadline if request_deadline is None else min(deadline, request_deadline)
+    
+    def _feasible(
         self,
-        prompt: str,
-        providers: Optional[List[AIProvider]] = None,
-        system_prompt: Optional[str] = None
-    ) -> Dict[str, str]:
+        provider: AIProvider,
+        model: Optional[str],
+        candidates: List[AIProvider],
+        tried: set,
+        remaining: float
+    ) -> Tuple[AIProvider, Optional[str]]:
         """
-        Generate responses from multiple providers simultaneously
+        Pick an endpoint that can plausibly answer within the remaining budget
+        
+        A provider is doomed when even its fast requests (the configured
+        latency percentile) take longer than the time left. Doomed
+        providers are passed over for an untried fallback that fits; the
+        call is never started when none does.
         
         Args:
-            prompt: User prompt
-            providers: List of providers to use (defaults to all available)
-            system_prompt: Optional system prompt
+            provider: Provider about to be called
+            model: Model about to be called
+            candidates: Providers eligible for this request
+            tried: Providers already attempted
+            remaining: Seconds left before the deadline
             
         Returns:
-            Dictionary mapping provider names to their responses
+            Provider and model to call
+            
+        Raises:
+            DeadlineExceeded: If no candidate fits the remaining budget
         """
-        if not providers:
-            providers = list(self.providers.keys())
+        if self.config.deadline_latency_percentile is None:
+            return provider, model
         
-        tasks = [
-            self.generate(prompt, provider=provider, system_prompt=system_prompt, use_cache=False)
-            for provider in providers
-        ]
+        def expected(candidate: AIProvider, candidate_model: Optional[str]) -> Optional[float]:
+            return self._provider_stats.latency_percentile(
+                candidate.value,
+                self.config.deadline_latency_percentile,
+                min_samples=self.config.hedge_min_samples,
+                model=candidate_model or "default"
+            )
         
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        latency = expected(provider, model)
+        if latency is None or latency < remaining:
+            return provider, model
         
-        return {
-            provider.value: result if not isinstance(result, Exception) else f"Error: {str(result)}"
-            for provider, result in zip(providers, results)
-        }
+        self.metrics["deadline_skips"] += 1
+        for candidate in candidates:
+            if candidate in tried or candidate == provider or not self.is_provider_available(candidate):
+                continue
+            candidate_latency = expected(candidate, None)
+            if candidate_latency is None or candidate_latency < remaining:
+                print(f"Skipping {provider.value}: {remaining:.2f}s left, typically takes {latency:.2f}s")
+                return candidate, None
+        
+        raise DeadlineExceeded(
+            f"{remaining:.2f}s left is less than {provider.value} needs ({latency:.2f}s) and no fallback fits"
+        )
     
-    async def smart_route(
+    def _retry_candidates(self, provider: AIProvider) -> List[AIProvider]:
+        """Providers a request may be retried on, starting with the primary"""
+        if not self.config.enable_fallback:
+            return [provider]
+        return [provider] + self._fallback_candidates(exclude=provider)
+    
+    def _plan_retry(
         self,
-        prompt: str,
-        task_type: str = "general",
-        system_prompt: Optional[str] = None,
-        **kwargs
-    ) -> str:
+        error: Exception,
+        current: AIProvider,
+        candidates: List[AIProvider],
+        tried: set,
+        attempt: int,
+        deadline: float
+    ) -> Tuple[AIProvider, float]:
         """
-        Intelligently route request to best provider based on task type
+        Decide where and when to retry a failed attempt
         
         Args:
-            prompt: User prompt
-            task_type: Type of task (general, code, reasoning, fast)
-            system_prompt: Optional system prompt
+            error: Error raised by the attempt
+            current: Provider that failed
+            candidates: Providers eligible for this request
+            tried: Providers already attempted
+            attempt: Retries made so far
+            deadline: Monotonic deadline for the whole request
             
         Returns:
-            Generated text from optimal provider
+            Provider to retry on and delay before retrying
+            
+        Raises:
+            Exception: If the request should not be retried
         """
-        # Route based on task type
-        routing_map = {
-            "code": (AIProvider.CEREBRAS, "qwen-3-coder-480b"),
-            "reasoning": (AIProvider.CEREBRAS, "qwen-3-235b-a22b-thinking-2507"),
-            "fast": (AIProvider.NVIDIA, "nvidia/nvidia-nemotron-nano-9b-v2"),
-            "advanced": (AIProvider.NVIDIA, "deepseek-ai/deepseek-v3.1"),
-            "general": (AIProvider.SAMBANOVA, "DeepSeek-V3.1")
-        }
+        self.metrics["error_count"] += 1
+        reason = str(error) or type(error).__name__
+        error_class = classify_error(error)
+        self.registry.inc("ai_errors_total", provider=current.value, error_class=error_class.value)
+        self.metrics["errors_by_class"][error_class.value] = (
+            self.metrics["errors_by_class"].get(error_class.value, 0) + 1
+        )
         
-        provider, model = routing_map.get(task_type, (self.config.default_provider, None))
+        if isinstance(error, DeadlineExceeded) or time.monotonic() >= deadline:
+            raise DeadlineExceeded(f"Generation failed (deadline exceeded): {reason}")
         
-        return await self.generate(
-            prompt,
+        if error_class not in RETRYABLE or attempt >= self._retry_policy.max_retries:
+            raise Exception(f"Generation failed: {reason}")
+        
+        # Moving past an open breaker doesn't load anyone, so it's free
+        if error_class != ErrorClass.UNAVAILABLE and not self._retry_budget.try_acquire():
+            raise Exception(f"Generation failed (retry budget exhausted): {reason}")
+        
+        # Fail over to untried providers immediately; back off when cycling around
+        next_provider = candidates[(candidates.index(current) + 1) % len(candidates)]
+        delay = 0.0 if next_provider not in tried else self._retry_policy.backoff(attempt, error)
+        if time.monotonic() + delay >= deadline:
+            raise DeadlineExceeded(f"Generation failed (deadline exceeded): {reason}")
+        
+        if next_provider != current:
+            print(f"Attempting failover to {next_provider.value}...")
+        self.metrics["retries"] += 1
+        
+        return next_provider, delay
+    
+    async def _call_provider(
+        self,
+        messages: List[Dict[str, str]],
+        provider: AIProvider,
+        model: Optional[str],
+        **kwargs
+    ) -> str:
+        """Send a single request to a provider and record its latency"""
+        client = self.providers.get(provider)
+        if not client:
+            raise Exception(f"Provider {provider.value} not initialized")
+        
+        breaker, acquired = await self._admit(messages, provider, model, kwargs.get("max_tokens"))
+        self._provider_stats.record_start(provider.value, model)
+        model_label = model or "default"
+        start_time = time.time()
+        try:
+            if self._batcher:
+                response = await self._batcher.submit(
+                    (provider, model),
+                    {"messages": messages, "model": model, **kwargs}
+                )
+            else:
+                response = await client.chat_completion(messages=messages, model=model, **kwargs)
+        except asyncio.CancelledError:
+            self._provider_stats.record_cancel(provider.value, model)
+            self.registry.inc("ai_requests_total", provider=provider.value, model=model_label, outcome="cancelled")
+            if breaker:
+                breaker.release()
+            raise
+        except Exception as e:
+            self._provider_stats.record_failure(provider.value, model)
+            self.registry.inc("ai_requests_total", provider=provider.value, model=model_label, outcome="error")
+            if breaker:
+                self._record_breaker_failure(breaker, e)
+            raise
+        finally:
+            for limiter in acquired:
+                limiter.release()
+        
+        latency = time.time() - start_time
+        self._provider_stats.record_success(provider.value, model, latency)
+        self.registry.observe("ai_inference_duration_seconds", latency, provider=provider.value, model=model_label)
+        self.registry.inc("ai_requests_total", provider=provider.value, model=model_label, outcome="success")
+        self._record_usage(
+            provider,
+            model,
+            self.tokens.count_messages(messages),
+            self.tokens.count(response),
+            latency
+        )
+        self._remember_prefix(messages, provider, model)
+        if breaker:
+            breaker.record_success()
+        
+        return response
+    
+    async def _admit(
+        self,
+        messages: List[Dict[str, str]],
+        provider: AIProvider,
+        model: Optional[str],
+        max_tokens: Optional[int]
+    ) -> Tuple[Optional[CircuitBreaker], List[ProviderLimiter]]:
+        """
+        Pass the provider's breaker and queue behind its (and the model's) limits
+        
+        Args:
+            messages: Chat messages, for the token estimate
+            provider: AI provider to call
+            model: Specific model to call
+            max_tokens: Completion limit, for the token estimate
+            
+        Returns:
+            The admitting breaker (if any) and the limiters to release afterwards
+            
+        Raises:
+            CircuitBreakerOpen: If the provider's breaker rejects the request
+            RateLimitExceeded: If the limits can't admit it within limiter_max_wait
+        """
+        breaker = self._breakers.get(provider) if self.config.enable_circuit_breakers else None
+        if breaker:
+            breaker.acquire()
+        
+        limiters = [
+            limiter for limiter in (
+                self._limiters.get(provider.value),
+                self._limiters.get(f"{provider.value}/{model}") if model else None
+            )
+            if limiter is not None
+        ]
+        acquired = []
+        try:
+            estimated_tokens = self._estimate_tokens(messages, max_tokens)
+            for limiter in limiters:
+                await limiter.acquire(estimated_tokens)
+                acquired.append(limiter)
+        except BaseException:
+            for limiter in acquired:
+                limiter.release()
+            if breaker:
+                breaker.release()
+            raise
+        return breaker, acquired
+    
+    @staticmethod
+    def _record_breaker_failure(breaker: CircuitBreaker, error: BaseException) -> None:
+        """
+        Count a failed attempt against the provider's breaker
+        
+        Only provider-side failures (timeouts, 5xx, 429, connection
+        errors) count. Client errors such as an oversized prompt, and a
+        caller running out of its own deadline, say nothing about the
+        provider's health, so they only release the admitted request.
+        """
+        if not isinstance(error, DeadlineExceeded) and classify_error(error) in RETRYABLE:
+            breaker.record_failure()
+        else:
+            breaker.release()
+    
+    async def _dispatch_batch(
+        self,
+        key: Tuple[AIProvider, Optional[str]],
+        requests: List[Dict[str, Any]]
+    ) -> List[Any]:
+        """
+        Send a micro-batch to one provider/model
+        
+        Uses the client's native batch API when it has one, otherwise
+        submits the requests concurrently.
+        
+        Args:
+            key: (provider, model) the batch is for
+            requests: Keyword arguments for each chat_completion call
+            
+        Returns:
+            One response or exception per request
+        """
+        provider, _ = key
+        client = self.providers[provider]
+        
+        if hasattr(client, "chat_completion_batch"):
+            return await client.chat_completion_batch(requests)
+        
+        return await asyncio.gather(
+            *(client.chat_completion(**request) for request in requests),
+            return_exceptions=True
+        )
+    
+    def _estimate_tokens(self, messages: List[Dict[str, str]], max_tokens: Optional[int]) -> int:
+        """Prompt plus maximum completion tokens, for rate limiting"""
+        return self.tokens.count_messages(messages) + (max_tokens or 0)
+    
+    @staticmethod
+    def _build_messages(prompt: str, system_prompt: Optional[str]) -> List[Dict[str, str]]:
+        """Chat messages for a single prompt"""
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        return messages
+    
+    def count_usage(self, messages: List[Dict[str, str]], completion: str) -> Dict[str, int]:
+        """
+        Token usage of a conversation and its completion
+        
+        Args:
+            messages: Chat messages sent to the provider
+            completion: Generated text
+            
+        Returns:
+            OpenAI-style usage with prompt, completion and total tokens
+        """
+        prompt_tokens = self.tokens.count_messages(messages)
+        completion_tokens = self.tokens.count(completion)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    
+    def _record_usage(
+        self,
+        provider: AIProvider,
+        model: Optional[str],
+        prompt_tokens: int,
+        completion_tokens: int,
+        seconds: Optional[float] = None
+    ) -> None:
+        """Feed token counts into throughput and cost metrics"""
+        labels = {"provider": provider.value, "model": model or "default"}
+        self.registry.inc("ai_prompt_tokens_total", prompt_tokens, **labels)
+        self.registry.inc("ai_completion_tokens_total", completion_tokens, **labels)
+        if seconds and completion_tokens:
+            self.registry.observe("ai_output_tokens_per_second", completion_tokens / seconds, **labels)
+        
+        cost = self._cost(provider, model, prompt_tokens, completion_tokens)
+        if cost is not None:
+            self.registry.inc("ai_cost_usd_total", cost, **labels)
+    
+    def _cost(
+        self,
+        provider: AIProvider,
+        model: Optional[str],
+        prompt_tokens: int,
+        completion_tokens: int
+    ) -> Optional[float]:
+        """Estimated USD cost of a call, or None without configured prices"""
+        pricing = (
+            self.config.provider_pricing.get(f"{provider.value}/{model}")
+            or self.config.provider_pricing.get(provider.value)
+        )
+        if not pricing:
+            return None
+        return (
+            prompt_tokens * pricing.input_per_million
+            + completion_tokens * pricing.output_per_million
+        ) / 1_000_000
+    
+    def is_provider_available(self, provider: AIProvider) -> bool:
+        """Whether a provider is initialized and its breaker admits requests"""
+        if provider not in self.providers:
+            return False
+        if not self.config.enable_circuit_breakers:
+            return True
+        return self._breakers[provider].is_available()
+    
+    def get_provider_health(self) -> Dict[str, str]:
+        """Circuit breaker state per initialized provider"""
+        return {
+            provider.value: breaker.state.value
+            for provider, breaker in self._breakers.items()
+        }
+    
+    def _route(
+        self,
+        messages: List[Dict[str, str]],
+        provider: Optional[AIProvider],
+        model: Optional[str]
+    ) -> Tuple[AIProvider, Optional[str]]:
+        """
+        Pick the endpoint for a conversation
+        
+        Explicit choices are honoured. Otherwise the endpoint that last
+        served this conversation's longest stable prefix is preferred (its
+        prefix cache is warm), and the load balancer may still move the
+        request if that endpoint is much more loaded than the others.
+        
+        Args:
+            messages: Chat messages
+            provider: Requested provider, if any
+            model: Requested model, if any
+            
+        Returns:
+            Selected (provider, model)
+        """
+        if provider is not None or model is not None:
+            return provider or self.config.default_provider, model
+        
+        if not self._affinity:
+            return self._balance(self.config.default_provider, None)
+        
+        keys = prefix_keys(messages, self.config.affinity_min_prefix_chars)
+        sticky = self._affinity.lookup(keys)
+        if sticky is None:
+            if keys:
+                self.registry.inc("ai_affinity_lookups_total", result="miss")
+            return self._balance(self.config.default_provider, None)
+        
+        preferred = (AIProvider(sticky[0]), sticky[1])
+        chosen = self._balance(*preferred, preference=self.config.affinity_preference)
+        if chosen != preferred:
+            self._affinity.stats["overrides"] += 1
+            self.registry.inc("ai_affinity_lookups_total", result="override")
+        else:
+            self.registry.inc("ai_affinity_lookups_total", result="hit")
+        return chosen
+    
+    def _remember_prefix(
+        self,
+        messages: List[Dict[str, str]],
+        provider: AIProvider,
+        model: Optional[str]
+    ) -> None:
+        """Record that an endpoint now holds this conversation's prefixes"""
+        if not self._affinity:
+            return
+        keys = prefix_keys(messages, self.config.affinity_min_prefix_chars)
+        if keys:
+            self._affinity.record(keys, (provider.value, model))
+    
+    def _balance(
+        self,
+        provider: AIProvider,
+        model: Optional[str],
+        preference: Optional[float] = None
+    ) -> Tuple[AIProvider, Optional[str]]:
+        """
+        Treat a routing decision as a preference and let the balancer confirm it
+        
+        Args:
+            provider: Preferred provider
+            model: Preferred model on that provider
+            preference: Cost discount for the preferred endpoint
+            
+        Returns:
+            Selected (provider, model); other providers use their default model
+        """
+        if not self.config.enable_load_balancing or not self.providers:
+            return provider, model
+        
+        preferred = (provider.value, model)
+        candidates = [
+            (p.value, model if p == provider else None)
+            for p in self.providers
+            if self.is_provider_available(p)
+        ]
+        if not candidates:
+            return provider, model
+        if preferred not in candidates:
+            preferred = None
+        
+        chosen, chosen_model = self._load_balancer.choose(candidates, preferred=preferred, preference=preference)
+        return AIProvider(chosen), chosen_model
+    
+    def _hedge_delay(self, provider: AIProvider) -> float:
+        """Delay before hedging, from the provider's observed latency percentile"""
+        delay = self._provider_stats.latency_percentile(
+            provider.value,
+            self.config.hedge_percentile,
+            min_samples=self.config.hedge_min_samples
+        )
+        return self.config.hedge_delay if delay is None else delay
+    
+    async def _hedged_generate(
+        self,
+        messages: List[Dict[str, str]],
+        provider: AIProvider,
+        model: Optional[str],
+        **kwargs
+    ) -> Tuple[str, AIProvider, Optional[str]]:
+        """
+        Race a backup provider against a slow primary
+        
+        The primary request gets a head start equal to its observed latency
+        percentile; if it hasn't answered by then, the same request is sent
+        to the next fallback provider and whichever succeeds first wins.
+        
+        Args:
+            messages: Chat messages
+            provider: Primary AI provider
+            model: Specific model for the primary
+            
+        Returns:
+            Generated text from the first successful provider, with that
+            provider and model
+        """
+        primary = asyncio.ensure_future(
+            self._call_provider(messages, provider, model, **kwargs)
+        )
+        pending = {primary}
+        
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self._hedge_delay(provider))
+            if done:
+                return primary.result(), provider, model
+            
+            backup_providers = self._fallback_candidates(exclude=provider)
+            if not backup_providers:
+                return await primary, provider, model
+            
+            self.metrics["hedged_requests"] += 1
+            backup = asyncio.ensure_future(
+                self._call_provider(messages, backup_providers[0], None, **kwargs)
+            )
+            pending.add(backup)
+            
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self.metrics["hedge_wins"] += 1
+                            return task.result(), backup_providers[0], None
+                        return task.result(), provider, model
+            
+            # Both failed; surface the primary's error
+            return primary.result(), provider, model
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    def _fallback_candidates(self, exclude: AIProvider) -> List[AIProvider]:
+        """Initialized providers to fall back to, in configured order"""
+        return [
+            provider for provider in self.providers
+            if provider != exclude and self.is_provider_available(provider)
+        ]
+    
+    async def stream_generate(
+        self,
+        prompt: str,
+        provider: Optional[AIProvider] = None,
+        model: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        use_cache: bool = True,
+        priority: str = Priority.DEFAULT.value,
+        tenant: Optional[str] = None,
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """
+        Stream text generation from AI provider
+        
+        Cached responses are replayed as a chunked stream; completed
+        streams are written to the same cache used by generate().
+        
+        Args:
+            prompt: User prompt
+            provider: AI provider to use
+            model: Specific model to use
+            system_prompt: Optional system prompt
+            use_cache: Whether to use response cache
+            priority: Admission class (interactive, default, batch)
+            tenant: Tenant identifier for fair sharing within a class
+            
+        Yields:
+            Chunks of generated text
+        """
+        stream = self.stream_chat(
+            self._build_messages(prompt, system_prompt),
             provider=provider,
             model=model,
-            system_prompt=system_prompt,
+            use_cache=use_cache,
+            priority=priority,
+            tenant=tenant,
             **kwargs
         )
+        # Close the inner stream promptly on disconnect so its in-flight
+        # count and scheduler slot aren't held until garbage collection
+        try:
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+    
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        provider: Optional[AIProvider] = None,
+        model: Optional[str] = None,
+        use_cache: bool = True,
+        priority: str = Priority.DEFAULT.value,
+        tenant: Optional[str] = None,
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """
+        Stream the completion of a conversation
+        
+        Args:
+            messages: Chat messages (role and content), oldest first
+            provider: AI provider to use
+            model: Specific model to use
+            use_cache: Whether to use response cache
+            priority: Admission class (interactive, default, batch)
+            tenant: Tenant identifier for fair sharing within a class
+            
+        Yields:
+            Chunks of generated text
+        """
+        if not messages:
+            raise ValueError("At least one message is required")
+        
+        with self._track():
+            stream = self._stream_chat(messages, provider, model, use_cache, priority, tenant, **kwargs)
+            try:
+                async for chunk in stream:
+                    yield chunk
+            finally:
+                await stream.aclose()
+    
+    async def _stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        provider: Optional[AIProvider],
+        model: Optional[str],
+        use_cache: bool,
+        priority: str,
+        tenant: Optional[str],
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """Cache replay, retries and scheduling around one streamed completion"""
+        cache_key = None
+        if use_cache and self.config.enable_caching:
+            cache_key = self._get_cache_key(messages, provider, model, **kwargs)
+            cached = await self._cached_response(cache_key)
+            if cached is not None:
+                self.stream_metrics.stats["replays"] += 1
+                size = self.config.stream_replay_chunk_size
+                for i in range(0, len(cached.content), size):
+                    yield cached.content[i:i + size]
+                return
+        
+        provider, model = self._route(messages, provider, model)
+        started_at = time.monotonic()
+        served: Dict[str, Any] = {}
+        stream = coalesce(
+            self._stream_with_retries(messages, provider, model, started_at, served=served, **kwargs),
+            self.config.stream_flush_interval,
+            self.config.stream_flush_bytes
+        )
+        
+        self.stream_metrics.stats["streams"] += 1
+        parts: List[str] = []
+        try:
+            if not self._scheduler:
+                async for chunk in stream:
+                    parts.append(chunk)
+                    yield chunk
+            else:
+                # A stream holds its slot until the last chunk is delivered
+                async with self._scheduler.slot(priority, tenant):
+                    async for chunk in stream:
+                        parts.append(chunk)
+                        yield chunk
+        except Exception:
+            self.stream_metrics.stats["failed"] += 1
+            raise
+        finally:
+            await stream.aclose()
+        self.stream_metrics.stats["completed"] += 1
+        
+        # Only complete responses are cached; aborted streams never get here
+        if cache_key:
+            await self._store_response(cache_key, Completion(content="".join(parts), **served))
+    
+    async def _stream_with_retries(
+        self,
+        messages: List[Dict[str, str]],
+        provider: Optional[AIProvider],
+        model: Optional[str],
+        started_at: float,
+        served: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """
+        Stream from a provider with failover
+        
+        Before the first chunk, failures (including a first-token timeout)
+        are retried on other providers. After output has been delivered,
+        a failure is fatal unless stream resume is enabled, in which case
+        another provider is asked to continue from the partial output.
+        When the stream completes, ``served`` receives the provider and
+        model that finished it.
+        """
+        provider = provider or self.config.default_provider
+        
+        self._retry_budget.record_request()
+        deadline = self._request_deadline()
+        candidates = self._retry_candidates(provider)
+        tried = set()
+        current, current_model = provider, model
+        attempt = 0
+        resumes = 0
+        partial: List[str] = []
+        last = started_at
+        stats = self.stream_metrics.stats
+        
+        while True:
+            tried.add(current)
+            attempt_messages = self._resume_messages(messages, "".join(partial)) if partial else messages
+            attempt_output: List[str] = []
+            attempt_started = time.monotonic()
+            attempt_provider, attempt_model = current, current_model
+            admitted = False
+            breaker: Optional[CircuitBreaker] = None
+            limiters: List[ProviderLimiter] = []
+            
+            try:
+                client = self.providers.get(current)
+                if not client:
+                    raise Exception(f"Provider {current.value} not initialized")
+                
+                # Limits are held for the whole stream, like a non-streamed call
+                breaker, limiters = await self._admit(
+                    attempt_messages, current, current_model, kwargs.get("max_tokens")
+                )
+                admitted = True
+                self._provider_stats.record_start(current.value, current_model)
+                
+                stream = client.stream_chat_completion(attempt_messages, model=current_model, **kwargs)
+                async for chunk in self._iter_until(stream, deadline, self.config.stream_ttft_timeout):
+                    now = time.monotonic()
+                    if partial:
+                        self.stream_metrics.observe_inter_token(current.value, current_model, now - last)
+                    else:
+                        self.stream_metrics.observe_first_token(current.value, current_model, now - started_at)
+                    if not attempt_output:
+                        self._remember_prefix(attempt_messages, current, current_model)
+                    last = now
+                    partial.append(chunk)
+                    attempt_output.append(chunk)
+                    stats["chunks"] += 1
+                    yield chunk
+                self._provider_stats.record_success(
+                    current.value, current_model, time.monotonic() - attempt_started
+                )
+                if breaker:
+                    breaker.record_success()
+                if served is not None:
+                    served.update(provider=current.value, model=current_model)
+                return
+                
+            except Exception as e:
+                # Don't hold limits through the retry backoff
+                for limiter in limiters:
+                    limiter.release()
+                limiters = []
+                if admitted:
+                    self._provider_stats.record_failure(attempt_provider.value, attempt_model)
+                    if breaker:
+                        self._record_breaker_failure(breaker, e)
+                if isinstance(e, FirstTokenTimeout):
+                    stats["ttft_timeouts"] += 1
+                if partial:
+                    stats["aborts"] += 1
+                    if not self.config.enable_stream_resume or resumes >= self.config.stream_max_resumes:
+                        raise
+                
+                next_provider, delay = self._plan_retry(e, current, candidates, tried, attempt, deadline)
+                if partial:
+                    resumes += 1
+                    stats["resumes"] += 1
+                if next_provider != current:
+                    current_model = None
+                current = next_provider
+                attempt += 1
+                if delay:
+                    await asyncio.sleep(delay)
+            
+            except BaseException:
+                # Cancelled, or the consumer closed the stream
+                if admitted:
+                    self._provider_stats.record_cancel(attempt_provider.value, attempt_model)
+                    if breaker:
+                        breaker.release()
+                raise
+            
+            finally:
+                for limiter in limiters:
+                    limiter.release()
+                # Interrupted attempts still consumed tokens
+                if attempt_output:
+                    self._record_usage(
+                        attempt_provider,
+                        attempt_model,
+                        self.tokens.count_messages(attempt_messages),
+                        self.tokens.count("".join(attempt_output)),
+                        time.monotonic() - attempt_started
+                    )
+    
+    def _resume_messages(self, messages: List[Dict[str, str]], partial: str) -> List[Dict[str, str]]:
+        """Conversation asking a provider to continue an interrupted answer"""
+        return messages + [
+            {"role": "assistant", "content": partial},
+            {"role": "user", "content": self.config.stream_resume_prompt}
+        ]
+    
+    @staticmethod
+    async def _iter_until(
+        stream: AsyncGenerator[str, None],
+        deadline: float,
+        first_chunk_timeout: Optional[float] = None
+    ) -> AsyncGenerator[str, None]:
+        """Iterate a provider stream, failing once the request deadline passes"""
+        first_chunk_by = time.monotonic() + first_chunk_timeout if first_chunk_timeout else deadline
+        limit = min(deadline, first_chunk_by)
+        try:
+            while True:
+                remaining = limit - time.monotonic()
+                if remaining <= 0:
+                    raise DeadlineExceeded("Request deadline exceeded")
+                try:
+                    chunk = await asyncio.wait_for(stream.__anext__(), timeout=remaining)
+                except StopAsyncIteration:
+                    return
+                except asyncio.TimeoutError:
+                    if limit < deadline:
+                        raise FirstTokenTimeout(f"No output within {first_chunk_timeout}s")
+                    raise DeadlineExceeded("Request deadline exceeded")
+                yield chunk
+                limit = deadline
+        finally:
+            if hasattr(stream, "aclose"):
+                await stream.aclose()
+    
+    async def multi_provider_generate(
+        self,
+        prompt: str,
+        providers: Optional[List[AIProvider]] = None,
+        system_prompt: Optional[str] = None,
+        priority: str = Priority.BATCH.value,
+        tenant: Optional[str] = None,
+        mode: str = "all",
+        quorum: Optional[int] = None,
+        provider_timeout: Optional[Union[float, Dict[str, float]]] = None,
+        stragglers: str = "cancel"
+    ) -> Dict[str, str]:
+        """
+        Generate responses from multiple providers simultaneously
+        
+        Args:
+            prompt: User prompt
+            providers: List of providers to use (defaults to all available)
+            system_prompt: Optional system prompt
+            priority: Admission class; fan-outs default to batch
+            tenant: Tenant identifier for fair sharing within a class
+            mode: "all" waits for every provider, "first" returns after the
+                first success, "quorum" after ``quorum`` successes
+            quorum: Successes needed in quorum mode
+            provider_timeout: Seconds allowed per provider, as one value or
+                a mapping of provider name to seconds
+            stragglers: "cancel" or "background" for providers still running
+                once the result is returned
+            
+        Returns:
+            Dictionary mapping provider names to their responses (only
+            providers that finished, in completion order)
+        """
+        if mode not in ("all", "first", "quorum"):
+            raise ValueError(f"Unknown fan-out mode: {mode}")
+        needed = {"all": None, "first": 1, "quorum": quorum or 1}[mode]
+        
+        results: Dict[str, str] = {}
+        successes = 0
+        fan_out = self.iter_multi_provider(
+            prompt,
+            providers=providers,
+            system_prompt=system_prompt,
+            priority=priority,
+            tenant=tenant,
+            provider_timeout=provider_timeout,
+            stragglers=stragglers
+        )
+        try:
+            async for result in fan_out:
+                if result["error"] is None:
+                    results[result["provider"]] = result["content"]
+                    successes += 1
+                else:
+                    results[result["provider"]] = f"Error: {result['error']}"
+                if needed is not None and successes >= needed:
+                    break
+        finally:
+            await fan_out.aclose()
+        
+        return results
+    
+    async def iter_multi_provider(
+        self,
+        prompt: str,
+        providers: Optional[List[AIProvider]] = None,
+        system_prompt: Optional[str] = None,
+        priority: str = Priority.BATCH.value,
+        tenant: Optional[str] = None,
+        provider_timeout: Optional[Union[float, Dict[str, float]]] = None,
+        stragglers: str = "cancel"
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Fan a prompt out to several providers and yield answers as they finish
+        
+        Closing the generator early cancels providers that are still
+        running, or leaves them to finish in the background (recording
+        their latency for the balancer) when ``stragglers`` is "background".
+        
+        Args:
+            prompt: User prompt
+            providers: List of providers to use (defaults to all available)
+            system_prompt: Optional system prompt
+            priority: Admission class; fan-outs default to batch
+            tenant: Tenant identifier for fair sharing within a class
+            provider_timeout: Seconds allowed per provider, as one value or
+                a mapping of provider name to seconds
+            stragglers: "cancel" or "background"
+            
+        Yields:
+            Dicts with provider, content, error and latency, in completion order
+        """
+        if not providers:
+            providers = list(self.providers.keys())
+        
+        def timeout_for(provider: AIProvider) -> Optional[float]:
+            if isinstance(provider_timeout, dict):
+                return provider_timeout.get(provider.value)
+            return provider_timeout
+        
+        async def run(provider: AIProvider) -> Dict[str, Any]:
+            start = time.monotonic()
+            try:
+                content = await asyncio.wait_for(
+                    self.generate(
+                        prompt,
+                        provider=provider,
+                        system_prompt=system_prompt,
+                        use_cache=False,
+                        priority=priority,
+                        tenant=tenant
+                    ),
+                    timeout=timeout_for(provider)
+                )
+                error = None
+            except DeadlineExceeded as e:
+                content, error = None, str(e)
+            except asyncio.TimeoutError:
+                content, error = None, f"Timed out after {timeout_for(provider)}s"
+            except Exception as e:
+                content, error = None, str(e)
+            return {
+                "provider": provider.value,
+                "content": content,
+                "error": error,
+                "latency": round(time.monotonic() - start, 4)
+            }
+        
+        pending = {asyncio.ensure_future(run(provider)) for provider in providers}
+        self.metrics["fan_outs"] += 1
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            if pending:
+                self.metrics["fan_out_stragglers"] += len(pending)
+                for task in pending:
+                    if stragglers == "background":
+                        self._background.add(task)
+                        task.add_done_callback(self._background.discard)
+                    else:
+                        task.cancel()
+    
+    async def smart_route(
+        self,
+        prompt: str,
+        task_type: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        cascade: Optional[bool] = None,
+        prediction: Optional[TaskPrediction] = None,
+        **kwargs
+    ) -> str:
+        """
+        Intelligently route request to best provider based on task type
+        
+        Args:
+            prompt: User prompt
+            task_type: Type of task (general, code, reasoning, fast,
+                advanced); inferred from the prompt when omitted or unknown
+            system_prompt: Optional system prompt
+            cascade: Try the cheap cascade model first (defaults to the
+                config for this task type)
+            prediction: Classification already made for this prompt
+            
+        Returns:
+            Generated text from optimal provider
+        """
+        # Route based on task type
+        routing_map = {
+            "code": (AIProvider.CEREBRAS, "qwen-3-coder-480b"),
+            "reasoning": (AIProvider.CEREBRAS, "qwen-3-235b-a22b-thinking-2507"),
+            "fast": (AIProvider.NVIDIA, "nvidia/nvidia-nemotron-nano-9b-v2"),
+            "advanced": (AIProvider.NVIDIA, "deepseek-ai/deepseek-v3.1"),
+            "general": (AIProvider.SAMBANOVA, "DeepSeek-V3.1")
+        }
+        
+        source = "caller"
+        if task_type not in routing_map:
+            if prediction is None and self.config.enable_task_classifier:
+                prediction = self.classify_task(prompt)
+            if prediction is not None:
+                task_type, source = prediction.task_type, "classifier"
+            elif task_type is None:
+                task_type = "general"
+        else:
+            prediction = None
+        
+        provider, model = routing_map.get(task_type, (self.config.default_provider, None))
+        
+        # Semantic caching is opt-in per task type (e.g. off for code)
+        kwargs.setdefault(
+            "use_semantic_cache",
+            task_type in self.config.semantic_cache_task_types
+        )
+        
+        if cascade is None:
+            cascade = self.config.enable_cascade and task_type in self.config.cascade_task_types
+            # A failed cheap attempt at a long answer wastes the most time
+            limit = self.config.cascade_max_predicted_tokens
+            if prediction and limit is not None and prediction.output_tokens > limit:
+                cascade = False
+        
+        answer = None
+        if (
+            cascade
+            and (provider, model) != (self.config.cascade_provider, self.config.cascade_model)
+            and self.is_provider_available(self.config.cascade_provider)
+        ):
+            # Escalations stay on the larger model rather than rebalancing
+            # onto whichever endpoint (possibly the cheap one) is least loaded
+            answer = await self._cascade(prompt, provider, model, system_prompt, **kwargs)
+        else:
+            provider, model = self._balance(provider, model)
+        
+        if answer is None:
+            answer = await self.generate(
+                prompt,
+                provider=provider,
+                model=model,
+                system_prompt=system_prompt,
+                **kwargs
+            )
+        
+        if task_type in routing_map:
+            self._log_route(prompt, task_type, source, answer)
+        return answer
+    
+    def classify_task(self, prompt: str) -> TaskPrediction:
+        """
+        Infer the task type and expected output length of a prompt
+        
+        Args:
+            prompt: User prompt
+            
+        Returns:
+            Prediction; low-confidence predictions resolve to "general"
+        """
+        return self.classify_tasks([prompt])[0]
+    
+    def classify_tasks(self, prompts: List[str]) -> List[TaskPrediction]:
+        """
+        Classify many prompts in one vectorized pass
+        
+        Args:
+            prompts: User prompts
+            
+        Returns:
+            One prediction per prompt, in order
+        """
+        if self._classifier is None:
+            path = self.config.task_classifier_path
+            self._classifier = TaskClassifier.load(path) if path else TaskClassifier.default()
+        
+        predictions = self._classifier.classify_batch(prompts)
+        for prediction in predictions:
+            if prediction.confidence < self.config.task_classifier_min_confidence:
+                prediction.task_type = "general"
+        self.metrics["classified_prompts"] += len(prompts)
+        return predictions
+    
+    def _log_route(self, prompt: str, task_type: str, source: str, answer: str) -> None:
+        """Append a routed request to the routing log used to train the classifier"""
+        if not self.config.routing_log_path:
+            return
+        line = json.dumps({
+            "prompt": prompt,
+            "task_type": task_type,
+            "source": source,
+            "output_tokens": self.tokens.count(answer),
+            "ts": round(time.time(), 3)
+        }) + "\n"
+        # File I/O runs in a worker thread so a slow disk never stalls the
+        # loop; close() waits for pending writes rather than cancelling them
+        task = asyncio.ensure_future(asyncio.to_thread(self._write_route_log, line))
+        self._routing_writes.add(task)
+        task.add_done_callback(self._routing_writes.discard)
+    
+    def _write_route_log(self, line: str) -> None:
+        """Write one routing log line, opening the log on first use"""
+        with self._routing_log_lock:
+            if self._routing_log_closed:
+                return
+            if self._routing_log is None:
+                directory = os.path.dirname(self.config.routing_log_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._routing_log = open(self.config.routing_log_path, "a", buffering=1)
+            self._routing_log.write(line)
+    
+    async def _cascade(
+        self,
+        prompt: str,
+        provider: AIProvider,
+        model: Optional[str],
+        system_prompt: Optional[str] = None,
+        **kwargs
+    ) -> Optional[str]:
+        """
+        Answer with the cheap cascade model and keep it if it verifies
+        
+        Args:
+            prompt: User prompt
+            provider: Provider the request would escalate to
+            model: Model the request would escalate to
+            system_prompt: Optional system prompt
+            
+        Returns:
+            The cheap answer, or None when the request should escalate
+        """
+        stats = self._cascade_stats
+        stats["requests"] += 1
+        fast_provider, fast_model = self.config.cascade_provider, self.config.cascade_model
+        start_time = time.monotonic()
+        
+        try:
+            answer = await self.generate(
+                prompt,
+                provider=fast_provider,
+                model=fast_model,
+                system_prompt=system_prompt,
+                **kwargs
+            )
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            print(f"Warning: cascade model failed, escalating: {e}")
+            stats["fast_failed"] += 1
+            self.registry.inc("ai_cascade_requests_total", outcome="fast_failed")
+            return None
+        
+        score = await self._verifier.score(prompt, answer)
+        elapsed = time.monotonic() - start_time
+        
+        prompt_tokens = self.tokens.count_messages(self._build_messages(prompt, system_prompt))
+        completion_tokens = self.tokens.count(answer)
+        fast_cost = self._cost(fast_provider, fast_model, prompt_tokens, completion_tokens)
+        
+        if score < self.config.cascade_threshold:
+            stats["escalated"] += 1
+            stats["latency_overhead"] += elapsed
+            self.registry.inc("ai_cascade_requests_total", outcome="escalated")
+            self.registry.inc("ai_cascade_latency_overhead_seconds_total", elapsed)
+            if fast_cost is not None:
+                stats["cost_overhead"] += fast_cost
+                self.registry.inc("ai_cascade_cost_overhead_usd_total", fast_cost)
+            return None
+        
+        stats["accepted"] += 1
+        self.registry.inc("ai_cascade_requests_total", outcome="accepted")
+        
+        # Savings against what the larger model typically costs for this request
+        large_latency = self._provider_stats.latency_percentile(provider.value, 50.0, model=model or "default")
+        if large_latency is not None:
+            saved = large_latency - elapsed
+            if saved >= 0:
+                stats["latency_saved"] += saved
+                self.registry.inc("ai_cascade_latency_saved_seconds_total", saved)
+            else:
+                stats["latency_overhead"] -= saved
+                self.registry.inc("ai_cascade_latency_overhead_seconds_total", -saved)
+        large_cost = self._cost(provider, model, prompt_tokens, completion_tokens)
+        if large_cost is not None:
+            saved_cost = large_cost - (fast_cost or 0.0)
+            if saved_cost >= 0:
+                stats["cost_saved"] += saved_cost
+                self.registry.inc("ai_cascade_cost_saved_usd_total", saved_cost)
+            else:
+                stats["cost_overhead"] -= saved_cost
+                self.registry.inc("ai_cascade_cost_overhead_usd_total", -saved_cost)
+        
+        return answer
+    
+    async def _judge(self, text: str) -> str:
+        """Grade a cascade answer with the judge model"""
+        return await self.generate(
+            text,
+            provider=self.config.cascade_judge_provider or self.config.cascade_provider,
+            model=self.config.cascade_judge_model or self.config.cascade_model
+        )
+    
+    def get_cascade_stats(self) -> Dict[str, Any]:
+        """Escalation rate and estimated savings of the cheap-first cascade"""
+        stats = self._cascade_stats
+        requests = stats["requests"]
+        return {
+            **stats,
+            "verifier": self.config.cascade_verifier,
+            "escalation_rate": round(
+                (stats["escalated"] + stats["fast_failed"]) / requests, 4
+            ) if requests else 0.0,
+            "net_latency_saved": round(stats["latency_saved"] - stats["latency_overhead"], 4),
+            "net_cost_saved": round(stats["cost_saved"] - stats["cost_overhead"], 6)
+        }
     
     def get_metrics(self) -> Dict[str, Any]:
         """Get performance metrics"""
-        return self.metrics
+        hedge_rate = 0.0
+        if self.metrics["requests_count"] > 0:
+            hedge_rate = self.metrics["hedged_requests"] / self.metrics["requests_count"]
+        
+        return {
+            **self.metrics,
+            "hedge_rate": round(hedge_rate, 4),
+            "provider_stats": self._provider_stats.get_stats(),
+            "load_balancer": self._load_balancer.get_stats(),
+            "affinity": self._affinity.get_stats() if self._affinity else None,
+            "retry_budget": self._retry_budget.get_stats(),
+            "scheduler": self._scheduler.get_stats() if self._scheduler else None,
+            "batching": self._batcher.get_stats() if self._batcher else None,
+            "http_pool": self.transport.get_stats() if self.transport else None,
+            "rate_limiters": {
+                key: limiter.get_stats() for key, limiter in self._limiters.items()
+            },
+            "circuit_breakers": {
+                provider.value: breaker.get_stats()
+                for provider, breaker in self._breakers.items()
+            },
+            "cache": self._cache.get_stats(),
+            "coalescing": self._inflight.get_stats(),
+            "disk_cache": self._disk_cache.get_stats() if self._disk_cache else None,
+            "semantic_cache": self._semantic_cache.get_stats() if self._semantic_cache else None,
+            "streaming": self.stream_metrics.get_stats(),
+            "latency": self.registry.get_stats(),
+            "tokenizer": self.tokens.get_stats(),
+            "cascade": self.get_cascade_stats(),
+            "shared_state": self.shared.get_stats() if self.shared else None,
+            "in_flight": self._active,
+            "draining": self._draining
+        }
     
-    def clear_cache(self):
+    async def clear_cache(self):
         """Clear response cache"""
         self._cache.clear()
+        if self._disk_cache:
+            await self._disk_cache.aclear()
+        if self._semantic_cache:
+            self._semantic_cache.clear()
     
     async def close(self):
-        """Close all provider clients"""
-        for client in self.providers.values():
+        """
+        Stop background work and release every client and connection
+        
+        Cleanup continues past individual failures, which are logged.
+        Call ``drain`` first to let in-flight requests finish.
+        """
+        self._draining = True
+        
+        # Stopping the metrics flusher removes this worker's snapshot
+        tasks = self._services + list(self._background)
+        for task in tasks:
+            task.cancel()
+        for result in await asyncio.gather(*tasks, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.warning(f"Background task failed during shutdown: {result!r}")
+        self._services.clear()
+        self.started = False
+        
+        for provider, client in self.providers.items():
             try:
                 await client.close()
-            except:
-                pass
+            except Exception as e:
+                logger.warning(f"Closing {provider.value} client failed: {e!r}")
+        
+        if self._disk_cache:
+            self._disk_cache.close()
+        
+        for result in await asyncio.gather(*self._routing_writes, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.warning(f"Writing the routing log failed: {result!r}")
+        with self._routing_log_lock:
+            self._routing_log_closed = True
+            if self._routing_log:
+                self._routing_log.close()
+                self._routing_log = None
+        
+        if self.shared:
+            try:
+                await self.shared.close()
+            except Exception as e:
+                logger.warning(f"Closing shared state failed: {e!r}")
+        
+        if self.transport:
+            await self.transport.aclose()
 
 
 # Global orchestrator instance
 _orchestrator: Optional[ModelOrchestrator] = None
+_lifecycle_lock = asyncio.Lock()
+_shutting_down = False
 
 
 def get_orchestrator() -> ModelOrchestrator:
-    """Get or create global orchestrator instance"""
+    """
+    Get or create global orchestrator instance
+    
+    Servers should create it eagerly with ``start_orchestrator``; lazy
+    creation here is for scripts and library use. Construction never
+    awaits, so callers on one event loop cannot race.
+    
+    Raises:
+        OrchestratorDraining: If ``shutdown_orchestrator`` has closed it
+    """
     global _orchestrator
     if _orchestrator is None:
+        if _shutting_down:
+            raise OrchestratorDraining("Orchestrator is shut down")
         _orchestrator = ModelOrchestrator()
     return _orchestrator
 
 
+async def start_orchestrator(
+    config: Optional[OrchestratorConfig] = None,
+    embed_fn: Optional[Callable[[str], Any]] = None
+) -> ModelOrchestrator:
+    """
+    Create (if needed) and start the global orchestrator
+    
+    Args:
+        config: Configuration for a newly created orchestrator
+        embed_fn: Semantic cache embedding model for a newly created orchestrator
+        
+    Returns:
+        The started orchestrator
+    """
+    global _orchestrator, _shutting_down
+    async with _lifecycle_lock:
+        _shutting_down = False
+        if _orchestrator is None:
+            _orchestrator = ModelOrchestrator(config, embed_fn=embed_fn)
+        await _orchestrator.start()
+        return _orchestrator
+
+
+async def shutdown_orchestrator(drain_timeout: Optional[float] = None) -> None:
+    """
+    Drain and close the global orchestrator
+    
+    The draining instance stays global until it is closed, so requests
+    arriving meanwhile are rejected by it rather than creating a new one;
+    afterwards ``get_orchestrator`` refuses to create a replacement.
+    
+    Args:
+        drain_timeout: Longest wait for in-flight requests (defaults to config)
+    """
+    global _orchestrator, _shutting_down
+    async with _lifecycle_lock:
+        _shutting_down = True
+        if _orchestrator is None:
+            return
+        try:
+            await _orchestrator.drain(drain_timeout)
+        finally:
+            try:
+                await _orchestrator.close()
+            finally:
+                _orchestrator = None
+
+
 async def ai_generate(
     prompt: str,
     provider: Optional[str] = None,
@@ -0,0 +1,83 @@
+"""
+🧩 Provider Registry
+Pluggable, lazily imported provider client factories
+"""
+
+import importlib
+from importlib import metadata
+from typing import Callable, Dict, List, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "ai_engine.providers"
+
+ProviderFactory = Callable[..., object]
+
+# Built-in providers, imported only when enabled
+_FACTORIES: Dict[str, Union[str, ProviderFactory]] = {
+    "nvidia": f"{__package__}.models.nvidia_wrapper:get_nvidia_client",
+    "sambanova": f"{__package__}.models.sambanova_wrapper:get_sambanova_client",
+    "cerebras": f"{__package__}.models.cerebras_wrapper:get_cerebras_client",
+    "mock": f"{__package__}.mock_provider:get_mock_client",
+}
+
+_entry_points_loaded = False
+
+
+def register_provider(name: str, factory: Union[str, ProviderFactory]) -> None:
+    """
+    Register a provider client factory
+
+    Args:
+        name: Provider name, as listed in the orchestrator's providers config
+        factory: Callable returning a client, or a "module:attribute" path
+    """
+    _FACTORIES[name] = factory
+    logger.debug(f"Registered provider factory: {name}")
+
+
+def _load_entry_points() -> None:
+    """Register factories advertised by installed packages"""
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+
+    try:
+        entries = metadata.entry_points(group=ENTRY_POINT_GROUP)
+    except TypeError:
+        entries = metadata.entry_points().get(ENTRY_POINT_GROUP, [])
+
+    for entry in entries:
+        _FACTORIES.setdefault(entry.name, entry.value)
+
+
+def get_provider_factory(name: str) -> ProviderFactory:
+    """
+    Resolve a provider factory, importing its module on first use
+
+    Args:
+        name: Provider name
+
+    Returns:
+        Client factory
+
+    Raises:
+        KeyError: If no factory is registered under name
+    """
+    _load_entry_points()
+    factory = _FACTORIES[name]
+
+    if isinstance(factory, str):
+        module_name, _, attribute = factory.partition(":")
+        factory = getattr(importlib.import_module(module_name), attribute)
+        _FACTORIES[name] = factory
+
+    return factory
+
+
+def available_providers() -> List[str]:
+    """Names of all registered providers"""
+    _load_entry_points()
+    return list(_FACTORIES)
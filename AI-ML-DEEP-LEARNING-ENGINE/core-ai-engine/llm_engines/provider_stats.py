@@ -0,0 +1,158 @@
+"""
+📈 Provider Statistics
+Rolling per-provider observations used for routing decisions
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional
+
+
+class LatencyWindow:
+    """Rolling window of recent request latencies"""
+
+    def __init__(self, size: int = 512):
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def observe(self, seconds: float) -> None:
+        """Record a latency sample"""
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Get a latency percentile over the window
+
+        Args:
+            q: Percentile in [0, 100]
+
+        Returns:
+            Latency in seconds, or None without samples
+        """
+        if not self._samples:
+            return None
+
+        ordered = sorted(self._samples)
+        idx = min(len(ordered) - 1, int(round(q / 100.0 * (len(ordered) - 1))))
+        return ordered[idx]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+@dataclass
+class EndpointStats:
+    """Observations for one provider or provider/model pair"""
+    latency: LatencyWindow
+    ewma_latency: Optional[float] = None
+    error_rate: float = 0.0
+    in_flight: int = 0
+    requests: int = 0
+    errors: int = 0
+
+
+class ProviderStats:
+    """
+    Provider Statistics Registry
+
+    Tracks recent latencies, smoothed error rates and in-flight requests
+    for every provider and for each provider/model pair, so the
+    orchestrator can derive hedging delays and balance load from what it
+    actually observes.
+    """
+
+    def __init__(self, window_size: int = 512, ewma_alpha: float = 0.3):
+        self.window_size = window_size
+        self.ewma_alpha = ewma_alpha
+        self._endpoints: Dict[str, EndpointStats] = {}
+
+    @staticmethod
+    def endpoint_key(provider: str, model: Optional[str] = None) -> str:
+        """Key for a provider (model=None) or a provider/model pair"""
+        return provider if model is None else f"{provider}/{model}"
+
+    def _get(self, key: str) -> EndpointStats:
+        """Get or create stats for an endpoint"""
+        stats = self._endpoints.get(key)
+        if stats is None:
+            stats = self._endpoints[key] = EndpointStats(latency=LatencyWindow(self.window_size))
+        return stats
+
+    def _scopes(self, provider: str, model: Optional[str]):
+        """Provider-wide stats plus the model-specific entry"""
+        yield self._get(provider)
+        yield self._get(self.endpoint_key(provider, model or "default"))
+
+    def record_start(self, provider: str, model: Optional[str] = None) -> None:
+        """Mark a request as in flight"""
+        for stats in self._scopes(provider, model):
+            stats.in_flight += 1
+            stats.requests += 1
+
+    def record_success(self, provider: str, model: Optional[str], seconds: float) -> None:
+        """Record a completed request"""
+        alpha = self.ewma_alpha
+        for stats in self._scopes(provider, model):
+            stats.in_flight = max(0, stats.in_flight - 1)
+            stats.latency.observe(seconds)
+            stats.ewma_latency = (
+                seconds if stats.ewma_latency is None
+                else (1 - alpha) * stats.ewma_latency + alpha * seconds
+            )
+            stats.error_rate = (1 - alpha) * stats.error_rate
+
+    def record_failure(self, provider: str, model: Optional[str] = None) -> None:
+        """Record a failed request"""
+        alpha = self.ewma_alpha
+        for stats in self._scopes(provider, model):
+            stats.in_flight = max(0, stats.in_flight - 1)
+            stats.errors += 1
+            stats.error_rate = (1 - alpha) * stats.error_rate + alpha
+
+    def record_cancel(self, provider: str, model: Optional[str] = None) -> None:
+        """Record a request abandoned before it completed"""
+        for stats in self._scopes(provider, model):
+            stats.in_flight = max(0, stats.in_flight - 1)
+
+    def get(self, provider: str, model: Optional[str] = None) -> Optional[EndpointStats]:
+        """Get stats for a provider or provider/model pair"""
+        return self._endpoints.get(self.endpoint_key(provider, model))
+
+    def latency_percentile(
+        self,
+        provider: str,
+        q: float,
+        min_samples: int = 1,
+        model: Optional[str] = None
+    ) -> Optional[float]:
+        """
+        Get a latency percentile for a provider
+
+        Args:
+            provider: Provider name
+            q: Percentile in [0, 100]
+            min_samples: Minimum samples required for a meaningful answer
+            model: Restrict to a single model (provider-wide if None)
+
+        Returns:
+            Latency in seconds, or None with too few samples
+        """
+        stats = self.get(provider, model)
+        if stats is None or len(stats.latency) < min_samples:
+            return None
+        return stats.latency.percentile(q)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-endpoint summary"""
+        return {
+            key: {
+                "requests": stats.requests,
+                "errors": stats.errors,
+                "in_flight": stats.in_flight,
+                "error_rate": round(stats.error_rate, 4),
+                "ewma_latency": stats.ewma_latency,
+                "p50": stats.latency.percentile(50),
+                "p95": stats.latency.percentile(95),
+                "p99": stats.latency.percentile(99)
+            }
+            for key, stats in self._endpoints.items()
+        }
@@ -0,0 +1,201 @@
+"""
+🚦 Rate Limiter
+Per-provider concurrency limits and token-bucket rate limiting
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .shared_state import SharedState
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request can't be admitted within the allowed wait"""
+
+    status_code = 429
+
+    def __init__(self, name: str, reason: str, retry_after: Optional[float] = None):
+        super().__init__(f"Local rate limit for {name} exceeded ({reason})")
+        self.name = name
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Token bucket with reservations
+
+    Waiters reserve tokens up front (the balance may go negative) and sleep
+    until their share has refilled, so queued requests are served in order
+    without polling.
+    """
+
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float, max_wait: float) -> Optional[float]:
+        """
+        Reserve tokens
+
+        Args:
+            amount: Tokens needed (clamped to capacity)
+            max_wait: Longest acceptable wait in seconds
+
+        Returns:
+            Seconds to wait before proceeding, or None if that exceeds max_wait
+        """
+        self._refill()
+        amount = min(amount, self.capacity)
+        wait = max(0.0, (amount - self._tokens) / self.rate)
+        if wait > max_wait:
+            return None
+        self._tokens -= amount
+        return wait
+
+    def refund(self, amount: float) -> None:
+        """Return tokens from a reservation that wasn't used"""
+        self._tokens = min(self.capacity, self._tokens + min(amount, self.capacity))
+
+    @property
+    def available(self) -> float:
+        """Tokens currently available"""
+        self._refill()
+        return self._tokens
+
+
+class ProviderLimiter:
+    """
+    Admission control for one provider or provider/model pair
+
+    Combines a concurrency semaphore with request and token buckets.
+    Requests queue for at most ``max_wait`` seconds in total and are
+    rejected immediately if the buckets can't admit them in time. With
+    ``shared`` state the buckets are drawn from by every worker, so the
+    configured rates hold for the whole deployment; the concurrency
+    limit stays per worker.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: Optional[int] = None,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_wait: float = 5.0,
+        shared: Optional[SharedState] = None
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_wait = max_wait
+        self._shared = shared
+
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self._requests = (
+            TokenBucket(requests_per_minute / 60.0, max(1.0, requests_per_minute / 60.0))
+            if requests_per_minute else None
+        )
+        self._tokens = (
+            TokenBucket(tokens_per_minute / 60.0, tokens_per_minute / 6.0)
+            if tokens_per_minute else None
+        )
+
+        self.in_flight = 0
+        self.queued = 0
+        self.stats = {
+            "admitted": 0,
+            "rejected": 0,
+            "total_wait": 0.0
+        }
+
+    async def acquire(self, estimated_tokens: int = 0) -> None:
+        """
+        Wait for admission
+
+        Args:
+            estimated_tokens: Expected prompt plus completion tokens
+
+        Raises:
+            RateLimitExceeded: If admission would take longer than max_wait
+        """
+        start = time.monotonic()
+        deadline = start + self.max_wait
+
+        waits = []
+        reserved: List[Tuple[TokenBucket, str, float]] = []
+        self.queued += 1
+        try:
+            for bucket, key, amount, reason in (
+                (self._requests, "requests", 1, "requests per minute"),
+                (self._tokens, "tokens", estimated_tokens, "tokens per minute"),
+            ):
+                if bucket is None or amount <= 0:
+                    continue
+                if self._shared is not None:
+                    wait = await self._shared.reserve(
+                        f"{self.name}:{key}", amount, bucket.rate, bucket.capacity, self.max_wait
+                    )
+                else:
+                    wait = bucket.reserve(amount, max_wait=self.max_wait)
+                if wait is None:
+                    self.stats["rejected"] += 1
+                    raise RateLimitExceeded(self.name, reason, retry_after=amount / bucket.rate)
+                waits.append(wait)
+                reserved.append((bucket, key, amount))
+
+            if waits and max(waits) > 0:
+                await asyncio.sleep(max(waits))
+
+            if self._semaphore is not None:
+                remaining = deadline - time.monotonic()
+                try:
+                    await asyncio.wait_for(self._semaphore.acquire(), timeout=max(0.0, remaining))
+                except asyncio.TimeoutError:
+                    self.stats["rejected"] += 1
+                    raise RateLimitExceeded(self.name, "max concurrency")
+        except BaseException:
+            # Rejected or cancelled requests don't spend the rate budget
+            for bucket, key, amount in reserved:
+                await self._refund(bucket, key, amount)
+            raise
+        finally:
+            self.queued -= 1
+
+        self.in_flight += 1
+        self.stats["admitted"] += 1
+        self.stats["total_wait"] += time.monotonic() - start
+
+    async def _refund(self, bucket: TokenBucket, key: str, amount: float) -> None:
+        """Return reserved tokens to the bucket they came from"""
+        if self._shared is not None:
+            await self._shared.refund(f"{self.name}:{key}", amount, bucket.capacity)
+        else:
+            bucket.refund(amount)
+
+    def release(self) -> None:
+        """Release a concurrency slot"""
+        self.in_flight = max(0, self.in_flight - 1)
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get limiter statistics"""
+        admitted = self.stats["admitted"]
+        return {
+            **self.stats,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_concurrency": self.max_concurrency,
+            "avg_wait": round(self.stats["total_wait"] / admitted, 4) if admitted else 0.0,
+            "shared": self._shared is not None,
+            "requests_available": self._requests.available if self._requests and not self._shared else None,
+            "tokens_available": self._tokens.available if self._tokens and not self._shared else None
+        }
@@ -0,0 +1,182 @@
+"""
+🗄️ Response Cache
+Bounded LRU/TTL cache for generated completions
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+
+def make_chat_cache_key(
+    provider: str,
+    model: Optional[str],
+    messages: List[Dict[str, str]],
+    **params
+) -> str:
+    """
+    Build a stable digest over a full conversation
+
+    Unlike the builtin ``hash()``, the digest is identical across processes
+    and restarts, so it can be shared with other cache tiers.
+
+    Args:
+        provider: Provider name
+        model: Model name (None for the provider default)
+        messages: Chat messages, in order
+        **params: Sampling parameters (temperature, max_tokens, ...)
+
+    Returns:
+        Hex digest identifying the request
+    """
+    payload = {
+        "provider": provider,
+        "model": model,
+        "messages": [[m.get("role"), m.get("content")] for m in messages],
+        "params": params,
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    """Single cached response"""
+    value: str
+    size: int
+    expires_at: Optional[float] = None
+
+
+class ResponseCache:
+    """
+    In-process response cache
+
+    Keeps at most ``max_entries`` responses and ``max_bytes`` of payload,
+    evicting least recently used entries first. Entries expire after their
+    TTL and are dropped lazily on access or eviction.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        default_ttl: Optional[float] = 3600.0
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "rejected": 0
+        }
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached response or None on miss
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.stats["expirations"] += 1
+            self.stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry.value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        """
+        Store a response
+
+        Args:
+            key: Cache key
+            value: Response to cache
+            ttl: Time to live in seconds (uses default_ttl if None)
+
+        Returns:
+            True if stored, False if the entry exceeds the byte limit
+        """
+        size = len(key) + len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            self.stats["rejected"] += 1
+            return False
+
+        if key in self._entries:
+            self._remove(key)
+
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+
+        self._entries[key] = CacheEntry(value=value, size=size, expires_at=expires_at)
+        self._bytes += size
+        self.stats["sets"] += 1
+
+        self._evict()
+        return True
+
+    def delete(self, key: str) -> bool:
+        """Remove a single entry"""
+        if key not in self._entries:
+            return False
+        self._remove(key)
+        return True
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        """Remove entry and release its bytes"""
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def _evict(self) -> None:
+        """Evict least recently used entries until within limits"""
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            key, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self.stats["evictions"] += 1
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        hit_rate = self.stats["hits"] / lookups if lookups else 0.0
+
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hit_rate": round(hit_rate, 4)
+        }
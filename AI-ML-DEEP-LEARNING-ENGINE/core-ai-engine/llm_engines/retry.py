@@ -0,0 +1,184 @@
+"""
+🔁 Retry Engine
+Error classification, jittered backoff and a global retry budget
+"""
+
+import asyncio
+import random
+import time
+from enum import Enum
+from typing import Any, Dict, Optional
+
+from .circuit_breaker import CircuitBreakerOpen
+
+
+class ErrorClass(str, Enum):
+    """How a failed attempt should be treated"""
+    RATE_LIMITED = "rate_limited"
+    TIMEOUT = "timeout"
+    SERVER_ERROR = "server_error"
+    UNAVAILABLE = "unavailable"
+    NON_RETRYABLE = "non_retryable"
+
+
+RETRYABLE = {
+    ErrorClass.RATE_LIMITED,
+    ErrorClass.TIMEOUT,
+    ErrorClass.SERVER_ERROR,
+    ErrorClass.UNAVAILABLE
+}
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    """Extract an HTTP status code from provider/httpx/openai style errors"""
+    for source in (exc, getattr(exc, "response", None)):
+        code = getattr(source, "status_code", None) or getattr(source, "status", None)
+        if isinstance(code, int):
+            return code
+    return None
+
+
+def classify_error(exc: BaseException) -> ErrorClass:
+    """
+    Classify a provider error
+
+    Args:
+        exc: Exception raised by an attempt
+
+    Returns:
+        Error class deciding whether and how to retry
+    """
+    if isinstance(exc, CircuitBreakerOpen):
+        return ErrorClass.UNAVAILABLE
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError)):
+        return ErrorClass.TIMEOUT
+
+    status = _status_code(exc)
+    if status is not None:
+        if status == 429:
+            return ErrorClass.RATE_LIMITED
+        if status == 408:
+            return ErrorClass.TIMEOUT
+        if status >= 500:
+            return ErrorClass.SERVER_ERROR
+        if status >= 400:
+            return ErrorClass.NON_RETRYABLE
+
+    message = str(exc).lower()
+    if "rate limit" in message or "too many requests" in message:
+        return ErrorClass.RATE_LIMITED
+    if "timeout" in message or "timed out" in message:
+        return ErrorClass.TIMEOUT
+    if "not initialized" in message:
+        return ErrorClass.UNAVAILABLE
+
+    # Programming and validation errors won't succeed on retry
+    if isinstance(exc, (ValueError, TypeError, KeyError, AttributeError)):
+        return ErrorClass.NON_RETRYABLE
+
+    return ErrorClass.SERVER_ERROR
+
+
+def retry_after_hint(exc: BaseException) -> Optional[float]:
+    """Server-suggested delay from a Retry-After header or attribute"""
+    value = getattr(exc, "retry_after", None)
+    if value is None:
+        headers = getattr(getattr(exc, "response", None), "headers", None)
+        if headers is not None:
+            value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryBudget:
+    """
+    Global retry budget
+
+    Every request deposits ``ratio`` tokens and every retry withdraws one,
+    so retries stay below ``ratio`` of traffic. ``min_per_second`` tokens
+    trickle in regardless, allowing a few retries when traffic is low.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.1,
+        min_per_second: float = 1.0,
+        max_balance: float = 100.0
+    ):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_balance = max_balance
+        self._balance = max_balance * ratio
+        self._updated = time.monotonic()
+
+        self.stats = {
+            "requests": 0,
+            "retries": 0,
+            "exhausted": 0
+        }
+
+    def _refill(self, amount: float = 0.0) -> None:
+        now = time.monotonic()
+        amount += (now - self._updated) * self.min_per_second
+        self._updated = now
+        self._balance = min(self.max_balance, self._balance + amount)
+
+    def record_request(self) -> None:
+        """Deposit the per-request share of the budget"""
+        self.stats["requests"] += 1
+        self._refill(self.ratio)
+
+    def try_acquire(self) -> bool:
+        """Withdraw one retry, or return False if the budget is spent"""
+        self._refill()
+        if self._balance < 1.0:
+            self.stats["exhausted"] += 1
+            return False
+        self._balance -= 1.0
+        self.stats["retries"] += 1
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get budget statistics"""
+        return {
+            **self.stats,
+            "balance": round(self._balance, 2),
+            "ratio": self.ratio
+        }
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter"""
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        rng: Optional[random.Random] = None
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rng = rng or random.Random()
+
+    def backoff(self, attempt: int, exc: Optional[BaseException] = None) -> float:
+        """
+        Delay before retry number ``attempt`` (0-based)
+
+        Args:
+            attempt: Retries already made
+            exc: Error that triggered the retry
+
+        Returns:
+            Delay in seconds
+        """
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        delay = self._rng.uniform(0, ceiling)
+
+        hint = retry_after_hint(exc) if exc is not None else None
+        if hint is not None:
+            delay = max(delay, min(hint, self.max_delay))
+        return delay
@@ -0,0 +1,170 @@
+"""
+🗓️ Priority Scheduler
+Weighted fair admission queue in front of provider capacity
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from .deadline import within_deadline
+
+
+class Priority(str, Enum):
+    """Request priority classes"""
+    INTERACTIVE = "interactive"
+    DEFAULT = "default"
+    BATCH = "batch"
+
+
+DEFAULT_CLASS_WEIGHTS = {
+    Priority.INTERACTIVE.value: 8.0,
+    Priority.DEFAULT.value: 4.0,
+    Priority.BATCH.value: 1.0
+}
+
+
+class SchedulerQueueFull(Exception):
+    """Raised when the admission queue is at capacity"""
+
+    status_code = 503
+
+
+class PriorityScheduler:
+    """
+    Weighted Fair Queueing Scheduler
+
+    Limits the number of requests dispatched upstream at once. When all
+    slots are busy, waiters are queued per flow (priority class + tenant)
+    and released in order of virtual finish time, so each flow receives
+    capacity in proportion to its class weight: interactive traffic
+    overtakes queued batch work, and tenants within a class share fairly.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 64,
+        class_weights: Optional[Dict[str, float]] = None,
+        max_queue: int = 1000
+    ):
+        self.max_concurrency = max_concurrency
+        self.class_weights = class_weights or dict(DEFAULT_CLASS_WEIGHTS)
+        self.max_queue = max_queue
+
+        self._active = 0
+        self._virtual_time = 0.0
+        self._flow_finish: Dict[Tuple[str, str], float] = {}
+        self._queue: List[Tuple[float, int, str, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+        self.class_stats: Dict[str, Dict[str, Any]] = {
+            name: self._empty_stats() for name in self.class_weights
+        }
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, Any]:
+        return {"queued": 0, "dispatched": 0, "rejected": 0, "total_wait": 0.0, "max_wait": 0.0}
+
+    def _stats_for(self, priority: str) -> Dict[str, Any]:
+        stats = self.class_stats.get(priority)
+        if stats is None:
+            stats = self.class_stats[priority] = self._empty_stats()
+        return stats
+
+    async def acquire(self, priority: str = Priority.DEFAULT.value, tenant: Optional[str] = None) -> None:
+        """
+        Wait for a dispatch slot
+
+        Args:
+            priority: Priority class name
+            tenant: Tenant identifier (flows are fair-shared per tenant)
+
+        Raises:
+            SchedulerQueueFull: If the queue is at capacity
+        """
+        stats = self._stats_for(priority)
+
+        if self._active < self.max_concurrency and not self._queue:
+            self._active += 1
+            stats["dispatched"] += 1
+            return
+
+        if len(self._queue) >= self.max_queue:
+            stats["rejected"] += 1
+            raise SchedulerQueueFull(f"Admission queue full ({self.max_queue} waiting)")
+
+        # Virtual finish time: flows advance by 1/weight per request
+        flow = (priority, tenant or "")
+        weight = self.class_weights.get(priority, 1.0)
+        finish = max(self._virtual_time, self._flow_finish.get(flow, 0.0)) + 1.0 / weight
+        self._flow_finish[flow] = finish
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (finish, next(self._seq), priority, future))
+        stats["queued"] += 1
+        start = time.monotonic()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was granted just as we were cancelled; pass it on
+                self.release()
+            else:
+                future.cancel()
+            raise
+        finally:
+            stats["queued"] -= 1
+
+        waited = time.monotonic() - start
+        stats["dispatched"] += 1
+        stats["total_wait"] += waited
+        stats["max_wait"] = max(stats["max_wait"], waited)
+
+    def release(self) -> None:
+        """Free a slot and hand it to the next waiter in fair order"""
+        while self._queue:
+            finish, _, _, future = heapq.heappop(self._queue)
+            if future.cancelled():
+                continue
+            self._virtual_time = finish
+            future.set_result(None)
+            return
+
+        self._active = max(0, self._active - 1)
+        if not self._queue:
+            self._flow_finish.clear()
+            self._virtual_time = 0.0
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        priority: str = Priority.DEFAULT.value,
+        tenant: Optional[str] = None
+    ) -> AsyncIterator[None]:
+        """Hold a dispatch slot for the duration of the block (waiting at most until the request deadline)"""
+        await within_deadline(self.acquire(priority, tenant), "admission")
+        try:
+            yield
+        finally:
+            self.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth and wait-time statistics per class"""
+        return {
+            "active": self._active,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": sum(1 for *_, future in self._queue if not future.cancelled()),
+            "classes": {
+                name: {
+                    **stats,
+                    "avg_wait": round(stats["total_wait"] / stats["dispatched"], 4)
+                    if stats["dispatched"] else 0.0
+                }
+                for name, stats in self.class_stats.items()
+            }
+        }
@@ -0,0 +1,209 @@
+"""
+🧲 Semantic Cache
+Embedding-similarity cache for near-duplicate prompts
+"""
+
+import re
+import time
+import zlib
+import importlib
+from typing import Any, Callable, Dict, List, Optional
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Lexical embeddings score "to German" vs "to French" or "do"/"do not"
+# around 0.9, so without a real embedding model only near-exact repeats
+# (case, punctuation, whitespace) are safe to serve from the cache
+LEXICAL_MIN_THRESHOLD = 0.98
+
+
+def hashed_ngram_embedding(text: str, dim: int = 384) -> np.ndarray:
+    """
+    Embed text as a normalized bag of hashed word and character n-grams
+
+    Deterministic across processes and cheap enough for the request path.
+    Texts that share most words and subwords land close together whatever
+    they mean, so this only backs near-exact matching (see
+    ``LEXICAL_MIN_THRESHOLD``).
+
+    Args:
+        text: Text to embed
+        dim: Embedding dimension
+
+    Returns:
+        L2-normalized embedding
+    """
+    embedding = np.zeros(dim, dtype=np.float32)
+    words = _TOKEN_RE.findall(text.lower())
+
+    features: List[str] = list(words)
+    features.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+    for word in words:
+        padded = f"#{word}#"
+        features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+
+    for feature in features:
+        h = zlib.crc32(feature.encode("utf-8"))
+        embedding[h % dim] += 1.0 if (h >> 31) & 1 else -1.0
+
+    norm = np.linalg.norm(embedding)
+    if norm > 0:
+        embedding /= norm
+    return embedding
+
+
+def load_embed_fn(path: str) -> Callable[[str], np.ndarray]:
+    """
+    Import a text embedding function from a ``module:attribute`` path
+
+    Args:
+        path: Import path, e.g. ``myapp.embeddings:embed``
+
+    Returns:
+        The callable mapping a prompt to a 1-D vector
+    """
+    module_name, _, attr = path.partition(":")
+    if not module_name or not attr:
+        raise ValueError(f"Embedder path {path!r} must look like 'module:attribute'")
+    embed_fn = getattr(importlib.import_module(module_name), attr)
+    if not callable(embed_fn):
+        raise ValueError(f"Embedder {path!r} is not callable")
+    return embed_fn
+
+
+class SemanticCache:
+    """
+    Semantic Response Cache
+
+    Stores prompt embeddings in a preallocated matrix and answers lookups
+    with the most similar cached prompt above ``threshold``. Entries are
+    scoped by namespace (provider, model, system prompt and sampling
+    parameters) so a paraphrase only matches an equivalent request.
+    Matching real paraphrases needs a semantic ``embed_fn``; the built-in
+    lexical embedding is limited to thresholds of at least
+    ``LEXICAL_MIN_THRESHOLD``.
+    """
+
+    def __init__(
+        self,
+        embedding_dim: int = 384,
+        threshold: float = LEXICAL_MIN_THRESHOLD,
+        max_entries: int = 5000,
+        ttl: Optional[float] = 3600.0,
+        embed_fn: Optional[Callable[[str], np.ndarray]] = None
+    ):
+        if embed_fn is None and threshold < LEXICAL_MIN_THRESHOLD:
+            raise ValueError(
+                f"Semantic cache threshold {threshold} needs an embed_fn; the lexical "
+                f"embedding confuses prompts with opposite meanings below {LEXICAL_MIN_THRESHOLD}"
+            )
+
+        self.embedding_dim = embedding_dim
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.embed_fn = embed_fn or (lambda text: hashed_ngram_embedding(text, embedding_dim))
+
+        self._embeddings = np.zeros((max_entries, embedding_dim), dtype=np.float32)
+        self._namespaces: List[Optional[str]] = [None] * max_entries
+        self._responses: List[Optional[str]] = [None] * max_entries
+        self._expires_at = np.full(max_entries, np.inf)
+        self._next = 0
+        self._size = 0
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "evictions": 0
+        }
+
+        logger.info(f"🧲 Semantic cache initialized (threshold={threshold}, max_entries={max_entries})")
+
+    def _best_match(self, embedding: np.ndarray, namespace: str) -> Optional[int]:
+        """Index of the most similar live entry in namespace, or None"""
+        if not self._size:
+            return None
+
+        similarities = self._embeddings[:self._size] @ embedding
+        live = self._expires_at[:self._size] > time.monotonic()
+        same_namespace = np.fromiter(
+            (ns == namespace for ns in self._namespaces[:self._size]),
+            dtype=bool,
+            count=self._size
+        )
+        similarities = np.where(live & same_namespace, similarities, -1.0)
+
+        idx = int(np.argmax(similarities))
+        if similarities[idx] < self.threshold:
+            return None
+        return idx
+
+    def lookup(self, prompt: str, namespace: str) -> Optional[str]:
+        """
+        Find a cached response for a similar prompt
+
+        Args:
+            prompt: User prompt
+            namespace: Request scope the match must share
+
+        Returns:
+            Cached response or None on miss
+        """
+        idx = self._best_match(self.embed_fn(prompt), namespace)
+        if idx is None:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        return self._responses[idx]
+
+    def add(self, prompt: str, response: str, namespace: str) -> None:
+        """
+        Cache a response under the prompt's embedding
+
+        Args:
+            prompt: User prompt
+            response: Generated response
+            namespace: Request scope
+        """
+        embedding = self.embed_fn(prompt)
+
+        # Replace an equivalent entry rather than storing a duplicate
+        idx = self._best_match(embedding, namespace)
+        if idx is None or float(self._embeddings[idx] @ embedding) < 0.999:
+            idx = self._next
+            if self._size == self.max_entries:
+                self.stats["evictions"] += 1
+            else:
+                self._size += 1
+            self._next = (self._next + 1) % self.max_entries
+
+        self._embeddings[idx] = embedding
+        self._namespaces[idx] = namespace
+        self._responses[idx] = response
+        self._expires_at[idx] = time.monotonic() + self.ttl if self.ttl else np.inf
+        self.stats["sets"] += 1
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        self._namespaces = [None] * self.max_entries
+        self._responses = [None] * self.max_entries
+        self._expires_at[:] = np.inf
+        self._next = 0
+        self._size = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": self._size,
+            "threshold": self.threshold,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0
+        }
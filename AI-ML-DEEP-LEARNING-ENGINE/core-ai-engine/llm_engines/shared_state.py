@@ -0,0 +1,315 @@
+"""
+🤝 Shared State
+Cache entries, rate-limit buckets and breaker trips shared between workers
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+import logging
+
+from .disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+
+class SharedState(ABC):
+    """
+    Cross-worker state backend
+
+    Every uvicorn worker owns its orchestrator, so without shared state N
+    workers mean N private caches and N independent rate limits, i.e. up
+    to N times the provider load. Backends store small string values with
+    a TTL and keep token buckets that are refilled and debited atomically,
+    so all workers draw from the same budget. Failures are logged and
+    treated as misses (or as admission) so a backend outage degrades to
+    per-worker behaviour instead of failing requests.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self.stats = {
+            "gets": 0,
+            "hits": 0,
+            "sets": 0,
+            "reservations": 0,
+            "rejections": 0,
+            "errors": 0
+        }
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        """Value stored under key, or None if missing or expired"""
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """Store a value, expiring after ttl seconds (None keeps it)"""
+
+    @abstractmethod
+    async def reserve(
+        self,
+        key: str,
+        amount: float,
+        rate: float,
+        capacity: float,
+        max_wait: float
+    ) -> Optional[float]:
+        """
+        Reserve tokens from a shared bucket
+
+        Same contract as ``TokenBucket.reserve``: the balance may go
+        negative and the caller sleeps until its share has refilled.
+
+        Args:
+            key: Bucket name
+            amount: Tokens needed (clamped to capacity)
+            rate: Refill rate per second
+            capacity: Bucket size
+            max_wait: Longest acceptable wait in seconds
+
+        Returns:
+            Seconds to wait, or None if that exceeds max_wait
+        """
+
+    @abstractmethod
+    async def refund(self, key: str, amount: float, capacity: float) -> None:
+        """Return tokens from a reservation that wasn't used"""
+
+    async def close(self) -> None:
+        """Release connections"""
+
+    def get_stats(self) -> Dict[str, Any]:
+        gets = self.stats["gets"]
+        return {
+            "backend": self.name,
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / gets, 4) if gets else 0.0
+        }
+
+
+class SQLiteSharedState(SharedState):
+    """
+    SQLite shared state for workers on one host
+
+    Point it at a file on a tmpfs (``/dev/shm`` on Linux) and it behaves
+    like a shared-memory segment with locking: values live in the disk
+    cache table, and token buckets are updated inside ``BEGIN IMMEDIATE``
+    transactions so concurrent workers never double-spend. Bucket clocks
+    use wall time because monotonic clocks differ between processes.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._cache = DiskCache(path, default_ttl=None)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "key TEXT PRIMARY KEY, "
+                "tokens REAL NOT NULL, "
+                "updated_at REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    async def get(self, key: str) -> Optional[str]:
+        self.stats["gets"] += 1
+        value = await self._cache.aget(key)
+        if value is not None:
+            self.stats["hits"] += 1
+        return value
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        self.stats["sets"] += 1
+        await self._cache.aset(key, value, ttl)
+
+    def _update_bucket(self, key: str, delta, capacity: float) -> Optional[float]:
+        """Apply ``delta(tokens) -> (new_tokens, result)`` to a bucket atomically"""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT tokens, updated_at FROM buckets WHERE key = ?", (key,)).fetchone()
+                tokens, updated_at = row if row else (capacity, now)
+                tokens, result = delta(tokens, max(0.0, now - updated_at))
+                conn.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                    (key, tokens, now)
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return result
+
+    async def reserve(self, key, amount, rate, capacity, max_wait):
+        amount = min(amount, capacity)
+
+        def take(tokens: float, elapsed: float):
+            tokens = min(capacity, tokens + elapsed * rate)
+            wait = max(0.0, (amount - tokens) / rate)
+            if wait > max_wait:
+                return tokens, None
+            return tokens - amount, wait
+
+        try:
+            wait = await asyncio.to_thread(self._update_bucket, key, take, capacity)
+        except sqlite3.Error as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Shared rate limit unavailable, admitting locally: {e}")
+            return 0.0
+
+        self.stats["reservations" if wait is not None else "rejections"] += 1
+        return wait
+
+    async def refund(self, key, amount, capacity):
+        def give(tokens: float, elapsed: float):
+            return min(capacity, tokens + min(amount, capacity)), None
+
+        try:
+            await asyncio.to_thread(self._update_bucket, key, give, capacity)
+        except sqlite3.Error as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Shared rate limit refund failed: {e}")
+
+    async def close(self) -> None:
+        self._cache.close()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Refill-and-take on a hash {t: tokens, u: updated}, timed by the Redis clock
+_RESERVE_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local amount = tonumber(ARGV[3])
+local max_wait = tonumber(ARGV[4])
+local tokens = tonumber(redis.call('HGET', KEYS[1], 't') or capacity)
+local updated = tonumber(redis.call('HGET', KEYS[1], 'u') or now)
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = math.max(0, (amount - tokens) / rate)
+if wait <= max_wait then
+    tokens = tokens - amount
+end
+redis.call('HSET', KEYS[1], 't', tostring(tokens), 'u', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity / rate + max_wait) * 1000) + 1000)
+if wait > max_wait then
+    return nil
+end
+return tostring(wait)
+"""
+
+_REFUND_SCRIPT = """
+local capacity = tonumber(ARGV[2])
+local tokens = tonumber(redis.call('HGET', KEYS[1], 't') or capacity)
+redis.call('HSET', KEYS[1], 't', tostring(math.min(capacity, tokens + tonumber(ARGV[1]))))
+"""
+
+
+class RedisSharedState(SharedState):
+    """
+    Redis shared state for workers on one or more hosts
+
+    Requires the optional ``redis`` package. Buckets are updated by Lua
+    scripts so each reservation is a single atomic round trip.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "ai-engine:"):
+        super().__init__()
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise ImportError("Redis shared state requires the 'redis' package (pip install redis)") from e
+
+        self.prefix = prefix
+        self._redis = redis.from_url(url, decode_responses=True)
+        self._reserve = self._redis.register_script(_RESERVE_SCRIPT)
+        self._refund = self._redis.register_script(_REFUND_SCRIPT)
+
+    async def get(self, key: str) -> Optional[str]:
+        self.stats["gets"] += 1
+        try:
+            value = await self._redis.get(self.prefix + key)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Shared state read failed: {e}")
+            return None
+        if value is not None:
+            self.stats["hits"] += 1
+        return value
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        self.stats["sets"] += 1
+        try:
+            await self._redis.set(self.prefix + key, value, px=int(ttl * 1000) if ttl else None)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Shared state write failed: {e}")
+
+    async def reserve(self, key, amount, rate, capacity, max_wait):
+        try:
+            wait = await self._reserve(
+                keys=[f"{self.prefix}bucket:{key}"],
+                args=[rate, capacity, min(amount, capacity), max_wait]
+            )
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Shared rate limit unavailable, admitting locally: {e}")
+            return 0.0
+
+        if wait is None:
+            self.stats["rejections"] += 1
+            return None
+        self.stats["reservations"] += 1
+        return float(wait)
+
+    async def refund(self, key, amount, capacity):
+        try:
+            await self._refund(keys=[f"{self.prefix}bucket:{key}"], args=[min(amount, capacity), capacity])
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Shared rate limit refund failed: {e}")
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+def create_shared_state(url: str) -> SharedState:
+    """
+    Create a shared state backend from a URL
+
+    Args:
+        url: ``sqlite:///path/to/state.db`` or ``redis://host:port/db``
+
+    Returns:
+        Backend instance
+    """
+    if url.startswith("sqlite:///"):
+        return SQLiteSharedState(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisSharedState(url)
+    raise ValueError(f"Unsupported shared state URL: {url}")
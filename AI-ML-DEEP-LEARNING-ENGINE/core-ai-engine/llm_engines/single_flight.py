@@ -0,0 +1,80 @@
+"""
+🛬 Single Flight
+Coalesce concurrent identical requests into one upstream call
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+from .deadline import no_deadline
+
+
+class SingleFlight:
+    """
+    Request coalescing group
+
+    The first caller for a key becomes the leader and starts the upstream
+    call as a task; concurrent callers with the same key await that task
+    instead of issuing their own. The shared task is cancelled only when
+    every waiter has gone away. It runs without the leader's request
+    deadline, so a follower with a longer budget is not cut short by the
+    leader; callers bound their own wait with ``within_deadline``.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+
+        self.stats = {
+            "leaders": 0,
+            "coalesced": 0
+        }
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``fn`` once per key among concurrent callers
+
+        Args:
+            key: Request identity
+            fn: Coroutine factory performing the upstream call
+
+        Returns:
+            Result of the shared call
+        """
+        task = self._calls.get(key)
+        if task is None:
+            with no_deadline():
+                task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda _: self._forget(key, task))
+            self.stats["leaders"] += 1
+        else:
+            self.stats["coalesced"] += 1
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._waiters.get(key) == 1:
+                task.cancel()
+            raise
+        finally:
+            if key in self._waiters and self._calls.get(key) is task:
+                self._waiters[key] -= 1
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        """Drop a finished call so later requests start fresh"""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+            del self._waiters[key]
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing statistics"""
+        return {
+            **self.stats,
+            "in_flight": len(self._calls)
+        }
@@ -0,0 +1,247 @@
+"""
+📡 Streaming
+Chunk coalescing, SSE framing and latency metrics for token streams
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from contextlib import suppress
+from typing import Any, AsyncGenerator, AsyncIterable, Awaitable, Callable, Dict, List, Optional
+
+from .metrics import MetricsRegistry
+
+
+class FirstTokenTimeout(asyncio.TimeoutError):
+    """Raised when a provider produces no output within the first-token timeout"""
+
+
+class StreamMetrics:
+    """Time-to-first-token and inter-token latency per provider and model"""
+
+    TTFT = "ai_stream_ttft_seconds"
+    INTER_TOKEN = "ai_stream_inter_token_seconds"
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry()
+        self.registry.describe(self.TTFT, "Time from request start to the first streamed chunk")
+        self.registry.describe(self.INTER_TOKEN, "Gap between consecutive streamed chunks")
+        self.stats = {
+            "streams": 0,
+            "completed": 0,
+            "failed": 0,
+            "disconnects": 0,
+            "ttft_timeouts": 0,
+            "aborts": 0,
+            "resumes": 0,
+            "replays": 0,
+            "chunks": 0,
+            "frames": 0,
+            "bytes": 0
+        }
+
+    def observe_first_token(self, provider: str, model: Optional[str], seconds: float) -> None:
+        """Record the delay between request start and the first chunk"""
+        self.registry.observe(self.TTFT, seconds, provider=provider, model=model or "default")
+
+    def observe_inter_token(self, provider: str, model: Optional[str], seconds: float) -> None:
+        """Record the gap between two consecutive upstream chunks"""
+        self.registry.observe(self.INTER_TOKEN, seconds, provider=provider, model=model or "default")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get stream counters and latency percentiles per provider/model"""
+        def summaries(name: str) -> Dict[str, Any]:
+            return {
+                f"{labels['provider']}/{labels['model']}": histogram.summary()
+                for labels, histogram in self.registry.series(name)
+            }
+
+        return {
+            **self.stats,
+            "ttft": summaries(self.TTFT),
+            "inter_token": summaries(self.INTER_TOKEN)
+        }
+
+
+async def coalesce(
+    stream: AsyncIterable[str],
+    flush_interval: float = 0.02,
+    max_bytes: int = 1024
+) -> AsyncGenerator[str, None]:
+    """
+    Merge small chunks into flush windows
+
+    The first chunk is passed through immediately so time-to-first-token
+    is unaffected. Later chunks are buffered until ``flush_interval``
+    seconds have passed since the first buffered chunk or ``max_bytes``
+    characters have accumulated. The upstream is pulled only when the
+    consumer asks for more, with at most one chunk read ahead, so a slow
+    reader slows the provider stream instead of growing a buffer.
+
+    Args:
+        stream: Upstream text chunks
+        flush_interval: Maximum time a chunk is held, in seconds (0 disables)
+        max_bytes: Flush as soon as this many characters are buffered
+
+    Yields:
+        Coalesced text chunks
+    """
+    if flush_interval <= 0:
+        async for chunk in stream:
+            yield chunk
+        return
+
+    loop = asyncio.get_running_loop()
+    iterator = stream.__aiter__()
+    pending: Optional[asyncio.Future] = None
+    parts: List[str] = []
+    size = 0
+    window_end = 0.0
+    first = True
+
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+
+            if parts:
+                done, _ = await asyncio.wait({pending}, timeout=max(0.0, window_end - loop.time()))
+                if not done:
+                    yield "".join(parts)
+                    parts, size = [], 0
+                    continue
+            else:
+                await asyncio.wait({pending})
+
+            future, pending = pending, None
+            try:
+                chunk = future.result()
+            except StopAsyncIteration:
+                break
+            except Exception:
+                if parts:
+                    yield "".join(parts)
+                raise
+
+            if not parts:
+                window_end = loop.time() + flush_interval
+            parts.append(chunk)
+            size += len(chunk)
+
+            if first or size >= max_bytes:
+                first = False
+                yield "".join(parts)
+                parts, size = [], 0
+
+        if parts:
+            yield "".join(parts)
+    finally:
+        if pending is not None and not pending.done():
+            pending.cancel()
+            with suppress(asyncio.CancelledError, StopAsyncIteration, Exception):
+                await pending
+        if hasattr(iterator, "aclose"):
+            await iterator.aclose()
+
+
+class SSEEncoder:
+    """
+    OpenAI-compatible chat.completion.chunk framing
+
+    The constant parts of every frame (id, created, model and the JSON
+    around the delta) are encoded once; each content frame joins those
+    prefixes and the escaped text in a single copy.
+    """
+
+    DONE = b"data: [DONE]\n\n"
+
+    def __init__(self, model: Optional[str], completion_id: Optional[str] = None):
+        self.completion_id = completion_id or f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        head = json.dumps({
+            "id": self.completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model
+        })[:-1].encode()
+
+        self._content_prefix = b"data: " + head + b', "choices": [{"index": 0, "delta": {"content": '
+        self._content_suffix = b'}, "finish_reason": null}]}\n\n'
+        self._role_frame = (
+            b"data: " + head
+            + b', "choices": [{"index": 0, "delta": {"role": "assistant"}, "finish_reason": null}]}\n\n'
+        )
+        self._finish_prefix = b"data: " + head + b', "choices": [{"index": 0, "delta": {}, "finish_reason": '
+
+    def role(self) -> bytes:
+        """Opening frame announcing the assistant role"""
+        return self._role_frame
+
+    def content(self, text: str) -> bytes:
+        """Frame carrying a content delta"""
+        return b"".join((
+            self._content_prefix,
+            json.dumps(text, ensure_ascii=False).encode(),
+            self._content_suffix
+        ))
+
+    def finish(self, reason: str = "stop") -> bytes:
+        """Closing frame with the finish reason"""
+        return self._finish_prefix + json.dumps(reason).encode() + b"}]}\n\n"
+
+    @staticmethod
+    def error(message: str, code: int = 500) -> bytes:
+        """Frame reporting a failure after the response has started"""
+        return b"data: " + json.dumps({"error": {"message": message, "code": code}}).encode() + b"\n\n"
+
+
+async def sse_frames(
+    chunks: AsyncIterable[str],
+    encoder: SSEEncoder,
+    is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+    metrics: Optional[StreamMetrics] = None
+) -> AsyncGenerator[bytes, None]:
+    """
+    Encode a text stream as SSE frames
+
+    The client connection is checked between frames; once it is gone the
+    upstream stream is closed, which cancels the provider request.
+
+    Args:
+        chunks: Text chunks (typically from stream_generate)
+        encoder: Frame encoder for this response
+        is_disconnected: Callable reporting whether the client went away
+        metrics: Optional stream metrics to update
+
+    Yields:
+        Encoded frames
+    """
+    iterator = chunks.__aiter__()
+    stats = metrics.stats if metrics else None
+
+    def sent(frame: bytes) -> bytes:
+        if stats is not None:
+            stats["frames"] += 1
+            stats["bytes"] += len(frame)
+        return frame
+
+    try:
+        yield sent(encoder.role())
+        async for text in iterator:
+            if is_disconnected and await is_disconnected():
+                if stats is not None:
+                    stats["disconnects"] += 1
+                return
+            yield sent(encoder.content(text))
+        yield sent(encoder.finish())
+    except (asyncio.CancelledError, GeneratorExit):
+        if stats is not None:
+            stats["disconnects"] += 1
+        raise
+    except Exception as e:
+        yield sent(encoder.error(str(e), getattr(e, "status_code", 500)))
+    finally:
+        if hasattr(iterator, "aclose"):
+            await iterator.aclose()
+
+    yield sent(SSEEncoder.DONE)
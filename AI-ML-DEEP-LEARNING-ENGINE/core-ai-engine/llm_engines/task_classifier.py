@@ -0,0 +1,365 @@
+"""
+🏷️ Task Classifier
+Hashed n-gram linear model that infers task type and output length for routing
+"""
+
+import argparse
+import json
+import math
+import re
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+# Only the head and tail of long prompts are featurized; the instruction
+# that decides the task type almost always sits at one end
+_HEAD_TOKENS = 192
+_TAIL_TOKENS = 64
+
+TASK_TYPES = ("general", "code", "reasoning", "fast", "advanced")
+
+# Small labelled set the default model is trained on until a model
+# trained on real traffic is configured: (prompt, task type, output tokens)
+SEED_EXAMPLES: Tuple[Tuple[str, str, int], ...] = (
+    ("Write a Python function that parses a CSV file and returns a list of dicts", "code", 350),
+    ("Fix this bug: TypeError: 'NoneType' object is not subscriptable in my code", "code", 300),
+    ("Implement a binary search tree class in Java with insert and delete", "code", 500),
+    ("Refactor this JavaScript snippet to use async/await instead of callbacks", "code", 300),
+    ("Write a SQL query that returns the top 5 customers by revenue", "code", 150),
+    ("How do I write a regex to match email addresses?", "code", 200),
+    ("def add(a, b): return a + b  -- add type hints and a docstring", "code", 120),
+    ("Create a React component with a form and input validation", "code", 600),
+    ("Solve for x: 3x + 7 = 22. Show your work step by step", "reasoning", 250),
+    ("Prove that the square root of 2 is irrational", "reasoning", 450),
+    ("If all bloops are razzies and all razzies are lazzies, are all bloops lazzies?", "reasoning", 200),
+    ("A train leaves at 3pm going 60 mph; another at 4pm at 80 mph. When does it catch up?", "reasoning", 300),
+    ("Think step by step: how many ways can 8 rooks be placed on a chessboard without attacking?", "reasoning", 500),
+    ("What is the probability of rolling two sixes with two dice? Explain the reasoning", "reasoning", 250),
+    ("Work through this logic puzzle and justify each deduction", "reasoning", 600),
+    ("Calculate the derivative of x^3 * sin(x) and simplify", "reasoning", 300),
+    ("What is the capital of France?", "fast", 10),
+    ("Translate 'good morning' into Spanish", "fast", 10),
+    ("Answer yes or no: is water wet?", "fast", 5),
+    ("Give me a synonym for happy", "fast", 8),
+    ("Convert 5 miles to kilometers", "fast", 15),
+    ("What year did World War II end?", "fast", 10),
+    ("Spell 'necessary' backwards", "fast", 10),
+    ("One word answer: opposite of cold?", "fast", 3),
+    ("Write a comprehensive, in-depth report on the economic impact of AI on labour markets", "advanced", 1500),
+    ("Design a scalable microservices architecture for a global payments platform, covering trade-offs", "advanced", 1400),
+    ("Write a detailed research proposal with methodology, risks and evaluation plan", "advanced", 1600),
+    ("Produce a thorough technical specification for a distributed database with replication", "advanced", 1800),
+    ("Analyze this legal contract in depth and list every risk with recommendations", "advanced", 1200),
+    ("Compare five cloud providers across cost, reliability and compliance in a long-form analysis", "advanced", 1300),
+    ("Write a complete business plan for a renewable energy startup", "advanced", 2000),
+    ("Explain how transformers work in detail with a full literature review", "advanced", 1500),
+    ("Tell me a fun fact about octopuses", "general", 80),
+    ("Summarize the plot of Pride and Prejudice", "general", 250),
+    ("What are some tips for better sleep?", "general", 250),
+    ("Explain what photosynthesis is", "general", 200),
+    ("Write a short poem about autumn", "general", 120),
+    ("Recommend a few books similar to The Hobbit", "general", 200),
+    ("How does a vaccine work?", "general", 250),
+    ("Draft a friendly email inviting my team to lunch", "general", 150),
+)
+
+
+@dataclass
+class TaskPrediction:
+    """Inferred task type with its confidence and expected completion length"""
+    task_type: str
+    confidence: float
+    output_tokens: int
+    scores: Dict[str, float] = field(default_factory=dict)
+
+
+def _features(text: str, dim: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Hashed unigram, bigram and shape features, L2-normalized"""
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) > _HEAD_TOKENS + _TAIL_TOKENS:
+        tokens = tokens[:_HEAD_TOKENS] + tokens[-_TAIL_TOKENS:]
+
+    features = list(tokens)
+    features.extend(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    # Coarse shape features; also guarantee every text has at least one feature
+    features.append(f"__len{min(12, int(math.log2(len(text) + 1)))}")
+    if "```" in text or "\n    " in text:
+        features.append("__code_block")
+    if text.rstrip().endswith("?"):
+        features.append("__question")
+
+    indices = np.empty(len(features), dtype=np.int64)
+    values = np.empty(len(features), dtype=np.float32)
+    for i, feature in enumerate(features):
+        h = zlib.crc32(feature.encode("utf-8"))
+        indices[i] = h % dim
+        values[i] = 1.0 if (h >> 31) & 1 else -1.0
+    values /= math.sqrt(len(features))
+    return indices, values
+
+
+def _featurize(texts: Sequence[str], dim: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Features of many texts, concatenated with row start offsets"""
+    parts = [_features(text, dim) for text in texts]
+    counts = np.array([len(indices) for indices, _ in parts], dtype=np.int64)
+    offsets = np.zeros(len(parts), dtype=np.int64)
+    np.cumsum(counts[:-1], out=offsets[1:])
+    indices = np.concatenate([indices for indices, _ in parts])
+    values = np.concatenate([values for _, values in parts])
+    return indices, values, offsets
+
+
+class TaskClassifier:
+    """
+    Task Classifier
+
+    A multinomial logistic regression over hashed word and bigram
+    features picks the task type, and a linear regression over the same
+    features predicts ``log(1 + completion tokens)``. Prediction is a
+    gather of weight rows and a segmented sum, so a short prompt costs
+    tens of microseconds and a batch is classified in one vectorized pass.
+    """
+
+    def __init__(self, labels: Sequence[str] = TASK_TYPES, dim: int = 1 << 14):
+        self.labels = list(labels)
+        self.dim = dim
+        self.weights = np.zeros((dim, len(self.labels)), dtype=np.float32)
+        self.bias = np.zeros(len(self.labels), dtype=np.float32)
+        self.length_weights = np.zeros(dim, dtype=np.float32)
+        self.length_bias = float(math.log1p(200))
+
+    # ------------------------------------------------------------------
+    # Prediction
+    # ------------------------------------------------------------------
+
+    def classify(self, prompt: str) -> TaskPrediction:
+        """
+        Classify one prompt
+
+        Args:
+            prompt: User prompt
+
+        Returns:
+            Predicted task type, confidence and output length
+        """
+        return self.classify_batch([prompt])[0]
+
+    def classify_batch(self, prompts: Sequence[str]) -> List[TaskPrediction]:
+        """
+        Classify many prompts in one vectorized pass
+
+        Args:
+            prompts: User prompts
+
+        Returns:
+            One prediction per prompt, in order
+        """
+        if not prompts:
+            return []
+
+        indices, values, offsets = _featurize(prompts, self.dim)
+        probs = self._probabilities(indices, values, offsets)
+        lengths = np.expm1(self._log_lengths(indices, values, offsets))
+
+        best = probs.argmax(axis=1)
+        return [
+            TaskPrediction(
+                task_type=self.labels[best[row]],
+                confidence=float(probs[row, best[row]]),
+                output_tokens=max(1, int(round(lengths[row]))),
+                scores={label: float(p) for label, p in zip(self.labels, probs[row])}
+            )
+            for row in range(len(prompts))
+        ]
+
+    def _probabilities(self, indices: np.ndarray, values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+        logits = np.add.reduceat(self.weights[indices] * values[:, None], offsets, axis=0) + self.bias
+        logits -= logits.max(axis=1, keepdims=True)
+        np.exp(logits, out=logits)
+        logits /= logits.sum(axis=1, keepdims=True)
+        return logits
+
+    def _log_lengths(self, indices: np.ndarray, values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+        return np.add.reduceat(self.length_weights[indices] * values, offsets) + self.length_bias
+
+    # ------------------------------------------------------------------
+    # Training
+    # ------------------------------------------------------------------
+
+    def fit(
+        self,
+        prompts: Sequence[str],
+        labels: Sequence[Optional[str]],
+        output_tokens: Optional[Sequence[Optional[int]]] = None,
+        epochs: int = 30,
+        learning_rate: float = 1.0,
+        l2: float = 1e-4,
+        batch_size: int = 256,
+        seed: int = 0
+    ) -> "TaskClassifier":
+        """
+        Train both heads with mini-batch gradient descent
+
+        Args:
+            prompts: Training prompts
+            labels: Task type per prompt (None to train only the length head)
+            output_tokens: Completion length per prompt (None where unknown)
+            epochs: Passes over the data
+            learning_rate: Step size
+            l2: Weight decay
+            batch_size: Prompts per step
+            seed: Shuffle seed
+
+        Returns:
+            self
+        """
+        unknown = {label for label in labels if label is not None} - set(self.labels)
+        if unknown:
+            raise ValueError(f"Unknown task types: {sorted(unknown)}")
+
+        n = len(prompts)
+        label_index = {label: i for i, label in enumerate(self.labels)}
+        targets = np.array([label_index.get(label, -1) if label else -1 for label in labels], dtype=np.int64)
+        lengths = np.array(
+            [
+                math.log1p(tokens) if tokens is not None and tokens >= 0 else np.nan
+                for tokens in (output_tokens if output_tokens is not None else [None] * n)
+            ],
+            dtype=np.float32
+        )
+        if np.isfinite(lengths).any():
+            self.length_bias = float(np.nanmean(lengths))
+
+        parts = [_features(prompt, self.dim) for prompt in prompts]
+        rng = np.random.default_rng(seed)
+
+        for _ in range(epochs):
+            order = rng.permutation(n)
+            for start in range(0, n, batch_size):
+                rows = order[start:start + batch_size]
+                counts = np.array([len(parts[r][0]) for r in rows], dtype=np.int64)
+                offsets = np.zeros(len(rows), dtype=np.int64)
+                np.cumsum(counts[:-1], out=offsets[1:])
+                indices = np.concatenate([parts[r][0] for r in rows])
+                values = np.concatenate([parts[r][1] for r in rows])
+                owner = np.repeat(np.arange(len(rows)), counts)
+
+                labelled = targets[rows] >= 0
+                if labelled.any():
+                    grad = self._probabilities(indices, values, offsets)
+                    grad[np.flatnonzero(labelled), targets[rows][labelled]] -= 1.0
+                    grad[~labelled] = 0.0
+                    grad /= labelled.sum()
+                    weight_grad = np.zeros_like(self.weights)
+                    np.add.at(weight_grad, indices, values[:, None] * grad[owner])
+                    self.weights -= learning_rate * (weight_grad + l2 * self.weights)
+                    self.bias -= learning_rate * grad.sum(axis=0)
+
+                measured = np.isfinite(lengths[rows])
+                if measured.any():
+                    error = self._log_lengths(indices, values, offsets) - lengths[rows]
+                    error[~measured] = 0.0
+                    error /= measured.sum()
+                    length_grad = np.zeros_like(self.length_weights)
+                    np.add.at(length_grad, indices, values * error[owner])
+                    self.length_weights -= learning_rate * (length_grad + l2 * self.length_weights)
+                    self.length_bias -= learning_rate * float(error.sum())
+
+        return self
+
+    @classmethod
+    def default(cls) -> "TaskClassifier":
+        """Classifier trained on the built-in seed examples"""
+        prompts, labels, lengths = zip(*SEED_EXAMPLES)
+        return cls().fit(prompts, labels, lengths, epochs=60)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        """Save weights to an .npz file"""
+        np.savez_compressed(
+            path,
+            labels=np.array(self.labels),
+            weights=self.weights,
+            bias=self.bias,
+            length_weights=self.length_weights,
+            length_bias=np.array(self.length_bias)
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "TaskClassifier":
+        """Load weights saved with ``save``"""
+        with np.load(path) as data:
+            classifier = cls(labels=[str(label) for label in data["labels"]], dim=data["weights"].shape[0])
+            classifier.weights = data["weights"].astype(np.float32)
+            classifier.bias = data["bias"].astype(np.float32)
+            classifier.length_weights = data["length_weights"].astype(np.float32)
+            classifier.length_bias = float(data["length_bias"])
+        return classifier
+
+
+def read_routing_log(paths: Iterable[str]) -> Tuple[List[str], List[Optional[str]], List[Optional[int]]]:
+    """
+    Read logged smart-route traffic
+
+    Each line is a JSON record with ``prompt``, ``task_type``, ``source``
+    and ``output_tokens``. Task types inferred by the classifier itself
+    are not used as labels (that would only reinforce its mistakes), but
+    their output lengths still train the length head.
+
+    Args:
+        paths: JSONL files written by the orchestrator's routing log
+
+    Returns:
+        Prompts, labels and output token counts
+    """
+    prompts: List[str] = []
+    labels: List[Optional[str]] = []
+    lengths: List[Optional[int]] = []
+    for path in paths:
+        with open(path) as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Skipping malformed routing log line {path}:{line_number}")
+                    continue
+                prompts.append(record["prompt"])
+                labels.append(record.get("task_type") if record.get("source") == "caller" else None)
+                lengths.append(record.get("output_tokens"))
+    return prompts, labels, lengths
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Train a classifier offline from routing logs"""
+    parser = argparse.ArgumentParser(description="Train the smart-route task classifier from routing logs")
+    parser.add_argument("logs", nargs="+", help="Routing log files (JSONL)")
+    parser.add_argument("--output", required=True, help="Where to write the model (.npz)")
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument("--no-seed", action="store_true", help="Do not mix in the built-in seed examples")
+    args = parser.parse_args(argv)
+
+    prompts, labels, lengths = read_routing_log(args.logs)
+    if not args.no_seed:
+        seed_prompts, seed_labels, seed_lengths = zip(*SEED_EXAMPLES)
+        prompts += seed_prompts
+        labels += seed_labels
+        lengths += seed_lengths
+
+    classifier = TaskClassifier().fit(prompts, labels, lengths, epochs=args.epochs)
+    classifier.save(args.output)
+    labelled = sum(1 for label in labels if label)
+    print(f"Trained on {len(prompts)} prompts ({labelled} labelled); saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
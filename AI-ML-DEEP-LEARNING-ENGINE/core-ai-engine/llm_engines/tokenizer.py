@@ -0,0 +1,132 @@
+"""
+🔢 Token Counter
+Tokenizer-backed token accounting with a cheap approximate fallback
+"""
+
+import os
+import re
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Word and punctuation pieces; a piece costs roughly one token per 4 characters
+_PIECE = re.compile(r"\w+|[^\w\s]")
+
+# Chat framing overhead per message and for the reply, as in the OpenAI format
+_TOKENS_PER_MESSAGE = 3
+_TOKENS_PER_REPLY = 3
+
+
+def approximate_tokens(text: str) -> int:
+    """Estimate tokens without a tokenizer"""
+    return sum((len(piece) + 3) // 4 for piece in _PIECE.findall(text))
+
+
+class TokenCounter:
+    """
+    Token Counter
+
+    Counts tokens with a tiktoken encoding when the package is installed,
+    otherwise with ``approximate_tokens``. Provider models (DeepSeek,
+    Qwen, Llama...) use their own vocabularies, so the encoding is an
+    approximation either way, but a BPE count tracks real usage far more
+    closely than character heuristics. Counts are memoized per string
+    because the same system prompts and conversation turns are counted
+    over and over.
+    """
+
+    def __init__(self, encoding_name: Optional[str] = None, cache_size: int = 4096):
+        self.encoding_name = encoding_name or os.getenv("AI_ENGINE_TOKENIZER", "cl100k_base")
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, int]" = OrderedDict()
+        self._encode = self._load_encoder()
+
+        self.stats = {
+            "counts": 0,
+            "cache_hits": 0
+        }
+
+    def _load_encoder(self):
+        try:
+            import tiktoken
+            return tiktoken.get_encoding(self.encoding_name).encode_ordinary
+        except ImportError:
+            logger.info("tiktoken not installed; using approximate token counts")
+        except Exception as e:
+            logger.warning(f"Tokenizer '{self.encoding_name}' unavailable ({e}); using approximate token counts")
+        return None
+
+    @property
+    def approximate(self) -> bool:
+        """Whether counts come from the fallback estimator"""
+        return self._encode is None
+
+    def count(self, text: str) -> int:
+        """
+        Count tokens in text
+
+        Args:
+            text: Text to count
+
+        Returns:
+            Token count
+        """
+        if not text:
+            return 0
+
+        self.stats["counts"] += 1
+        cached = self._cache.get(text)
+        if cached is not None:
+            self._cache.move_to_end(text)
+            self.stats["cache_hits"] += 1
+            return cached
+
+        tokens = len(self._encode(text)) if self._encode else approximate_tokens(text)
+
+        self._cache[text] = tokens
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return tokens
+
+    def count_messages(self, messages: Iterable[Dict[str, str]]) -> int:
+        """
+        Count prompt tokens of a chat conversation, including framing
+
+        Args:
+            messages: Chat messages with role and content
+
+        Returns:
+            Token count
+        """
+        total = _TOKENS_PER_REPLY
+        for message in messages:
+            total += _TOKENS_PER_MESSAGE + self.count(message.get("content") or "") + 1
+        return total
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get backend and cache statistics"""
+        counts = self.stats["counts"]
+        return {
+            **self.stats,
+            "backend": "approximate" if self.approximate else f"tiktoken:{self.encoding_name}",
+            "cache_entries": len(self._cache),
+            "cache_hit_rate": round(self.stats["cache_hits"] / counts, 4) if counts else 0.0
+        }
+
+
+_counter: Optional[TokenCounter] = None
+
+
+def get_token_counter() -> TokenCounter:
+    """Get the shared token counter"""
+    global _counter
+    if _counter is None:
+        _counter = TokenCounter()
+    return _counter
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens in text with the shared counter"""
+    return get_token_counter().count(text)
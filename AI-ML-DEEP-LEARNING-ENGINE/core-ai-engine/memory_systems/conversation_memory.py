@@ -9,6 +9,8 @@ from datetime import datetime
 from collections import deque
 import logging
 
+from ..llm_engines.tokenizer import count_tokens
+
 logger = logging.getLogger(__name__)
 
 
@@ -94,12 +96,11 @@ class ConversationMemory:
         """
         max_tokens = max_tokens or self.max_tokens
         
-        # Simple token estimation (4 chars ≈ 1 token)
         messages = []
         total_tokens = 0
         
         for msg in reversed(self.messages):
-            msg_tokens = len(msg.content) // 4
+            msg_tokens = count_tokens(msg.content)
             
             if total_tokens + msg_tokens > max_tokens:
                 break
@@ -114,7 +115,7 @@ class ConversationMemory:
     
     def _trim_to_token_limit(self) -> None:
         """Trim messages to stay within token limit"""
-        total_tokens = sum(len(msg.content) // 4 for msg in self.messages)
+        total_tokens = sum(count_tokens(msg.content) for msg in self.messages)
         
         while total_tokens > self.max_tokens and len(self.messages) > 1:
             # Remove oldest message (except system message if first)
@@ -122,9 +123,9 @@ class ConversationMemory:
                 removed = self.messages.__getitem__(1)
                 self.messages.remove(removed)
             else:
-                self.messages.popleft()
+                removed = self.messages.popleft()
             
-            total_tokens = sum(len(msg.content) // 4 for msg in self.messages)
+            total_tokens -= count_tokens(removed.content)
     
     def clear(self) -> None:
         """Clear all messages"""
@@ -146,7 +147,7 @@ class ConversationMemory:
         return {
             "total_messages": len(self.messages),
             "messages_by_role": messages_by_role,
-            "estimated_tokens": sum(len(msg.content) // 4 for msg in self.messages),
+            "estimated_tokens": sum(count_tokens(msg.content) for msg in self.messages),
             "first_message_time": self.messages[0].timestamp.isoformat(),
             "last_message_time": self.messages[-1].timestamp.isoformat()
         }
\ No newline at end of file
@@ -4,11 +4,14 @@ Reason + Act paradigm for interactive problem solving
 """
 
 import asyncio
+import time
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from enum import Enum
 import logging
 
+from ..llm_engines.deadline import remaining
+
 logger = logging.getLogger(__name__)
 
 
@@ -63,8 +66,18 @@ class ReActEngine:
         
         steps: List[ReActStep] = []
         context = problem
+        iteration_time = 0.0
+        deadline_reached = False
         
         for iteration in range(1, self.max_iterations + 1):
+            # Stop when the request deadline leaves no room for another iteration
+            left = remaining()
+            if left is not None and left <= iteration_time:
+                logger.warning(f"⏳ Deadline reached after {len(steps)} iterations")
+                deadline_reached = True
+                break
+            started = time.monotonic()
+            
             # Reason
             thought = await self._generate_thought(context, iteration)
             
@@ -90,6 +103,7 @@ class ReActEngine:
             
             # Update context
             context = f"{context}\n{reflection}"
+            iteration_time = max(iteration_time, time.monotonic() - started)
             
             # Check if problem is solved
             if self._is_solved(reflection):
@@ -116,7 +130,8 @@ class ReActEngine:
                 }
                 for s in steps
             ],
-            "final_answer": final_answer
+            "final_answer": final_answer,
+            "deadline_reached": deadline_reached
         }
         
         return result
@@ -10,6 +10,8 @@ import tempfile
 import os
 import logging
 
+from ..llm_engines.deadline import bounded_timeout
+
 logger = logging.getLogger(__name__)
 
 
@@ -42,7 +44,14 @@ class CodeExecutionTool:
         logger.info("💻 Executing Python code")
         
         self.execution_count += 1
-        timeout = timeout or self.timeout
+        timeout = bounded_timeout(timeout or self.timeout)
+        if timeout <= 0:
+            return {
+                "success": False,
+                "error": "Request deadline exceeded before execution",
+                "stdout": "",
+                "stderr": ""
+            }
         
         try:
             # Create temporary file
@@ -58,10 +67,7 @@ class CodeExecutionTool:
                     stderr=asyncio.subprocess.PIPE
                 )
                 
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
-                    timeout=timeout
-                )
+                stdout, stderr = await self._communicate(process, timeout)
                 
                 result = {
                     "success": process.returncode == 0,
@@ -85,7 +91,7 @@ class CodeExecutionTool:
             logger.error("⏱️ Execution timeout")
             return {
                 "success": False,
-                "error": f"Execution timeout ({timeout}s exceeded)",
+                "error": f"Execution timeout ({timeout:.3g}s exceeded)",
                 "stdout": "",
                 "stderr": ""
             }
@@ -98,6 +104,16 @@ class CodeExecutionTool:
                 "stderr": ""
             }
     
+    @staticmethod
+    async def _communicate(process: asyncio.subprocess.Process, timeout: float):
+        """Wait for a process's output, killing it when the timeout passes"""
+        try:
+            return await asyncio.wait_for(process.communicate(), timeout=timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise
+    
     async def execute_javascript(self, code: str, timeout: Optional[int] = None) -> Dict[str, Any]:
         """
         Execute JavaScript code using Node.js
@@ -112,7 +128,12 @@ class CodeExecutionTool:
         logger.info("💻 Executing JavaScript code")
         
         self.execution_count += 1
-        timeout = timeout or self.timeout
+        timeout = bounded_timeout(timeout or self.timeout)
+        if timeout <= 0:
+            return {
+                "success": False,
+                "error": "Request deadline exceeded before execution"
+            }
         
         try:
             # Create temporary file
@@ -128,10 +149,7 @@ class CodeExecutionTool:
                     stderr=asyncio.subprocess.PIPE
                 )
                 
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
-                    timeout=timeout
-                )
+                stdout, stderr = await self._communicate(process, timeout)
                 
                 result = {
                     "success": process.returncode == 0,
@@ -151,7 +169,7 @@ class CodeExecutionTool:
         except asyncio.TimeoutError:
             return {
                 "success": False,
-                "error": f"Execution timeout ({timeout}s exceeded)"
+                "error": f"Execution timeout ({timeout:.3g}s exceeded)"
             }
         except Exception as e:
             return {